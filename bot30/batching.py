@@ -0,0 +1,78 @@
+import asyncio
+import logging
+from collections.abc import Callable
+from concurrent.futures import Executor
+from typing import Generic, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class BatchExecutor(Generic[T, R]):
+    """
+    Runs `fn` in an executor over batches of the submitted items, so the cost
+    of handing work to a process pool is paid once per batch instead of once
+    per item. A batch is sent once `batch_size` items are waiting or after
+    `max_delay` secs, whichever comes first. `fn` must return one result per
+    item, in order.
+    """
+
+    def __init__(
+        self,
+        fn: Callable[[list[T]], list[R]],
+        executor: Executor,
+        batch_size: int = 16,
+        max_delay: float = 0.01,
+    ) -> None:
+        self.fn = fn
+        self.executor = executor
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self._pending: list[tuple[T, asyncio.Future[R]]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    async def submit(self, item: T) -> R:
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[R] = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list[tuple[T, asyncio.Future[R]]]) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(
+                self.executor, self.fn, [item for item, _ in batch]
+            )
+            # paired up front so a short result list fails the whole batch
+            paired = list(zip(batch, results, strict=True))
+            for (_, future), result in paired:
+                if not future.done():
+                    future.set_result(result)
+        except Exception as exc:
+            logger.warning("Batch of %s failed: %r", len(batch), exc)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+
+    async def close(self) -> None:
+        """Sends any waiting items and waits for the batches in flight."""
+        self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks)
@@ -0,0 +1,65 @@
+import json
+import logging
+import time
+from collections.abc import Iterable, Iterator
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import NamedTuple
+
+logger = logging.getLogger(__name__)
+
+ENCODING = "latin-1"
+
+
+class CapturedReply(NamedTuple):
+    timestamp: float
+    cmd: str
+    # the datagrams as received, before being reassembled into the reply
+    datagrams: list[bytes]
+
+
+def capture_reply(capture_dir: str, cmd: str, datagrams: list[bytes]) -> None:
+    """
+    Appends the reply datagrams, as received, to a daily capture file, one
+    JSON record per line. Failures are logged but never interrupt the caller.
+    """
+    now = time.time()
+    stamp = datetime.fromtimestamp(now, UTC).strftime("%Y%m%d")
+    path = Path(capture_dir) / f"{cmd}-{stamp}.jsonl"
+    record = {
+        "ts": now,
+        "cmd": cmd,
+        "datagrams": [d.decode(ENCODING) for d in datagrams],
+    }
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+    except Exception:
+        logger.exception("Failed to capture RCON %s reply to %s", cmd, path)
+
+
+def _capture_files(paths: Iterable[str]) -> Iterator[Path]:
+    for p in map(Path, paths):
+        if p.is_dir():
+            yield from sorted(p.glob("*.jsonl"))
+        else:
+            yield p
+
+
+def read_captures(paths: Iterable[str]) -> Iterator[CapturedReply]:
+    """
+    Yields the captured replies from the given capture files or directories
+    in the order they were recorded within each file.
+    """
+    for path in _capture_files(paths):
+        with path.open(encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                yield CapturedReply(
+                    timestamp=float(record["ts"]),
+                    cmd=record["cmd"],
+                    datagrams=[d.encode(ENCODING) for d in record["datagrams"]],
+                )
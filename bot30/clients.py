@@ -1,12 +1,9 @@
-import asyncio
 import logging
-from types import TracebackType
-from typing import Any, Self
+from typing import Any
 
-import asyncio_dgram
 import discord
 
-from .models import Server
+from .profiling import span
 
 logger = logging.getLogger(__name__)
 
@@ -47,19 +44,22 @@ class Bot30Client(discord.Client):
         self._guild: discord.Guild | None = None
 
     async def login(self, token: str) -> None:
-        await super().login(token)
-        async for guild in super().fetch_guilds():
-            if guild.name == self.server_name:
-                self._guild = guild
-                break
-        else:
-            raise ServerNotFoundError(self.server_name)
+        with span("login"):
+            await super().login(token)
+        with span("fetch_guilds"):
+            async for guild in super().fetch_guilds():
+                if guild.name == self.server_name:
+                    self._guild = guild
+                    break
+            else:
+                raise ServerNotFoundError(self.server_name)
 
     async def _channel_by_name(self, name: str) -> discord.TextChannel:
         logger.info("Looking for channel named [%s]", name)
         if self._guild is None:
             raise GuildNotFoundError(name)
-        channels = await self._guild.fetch_channels()
+        with span("fetch_channels"):
+            channels = await self._guild.fetch_channels()
         for ch in channels:
             if ch.name == name:
                 logger.info("Found channel: %s [%s]", ch.name, ch.id)
@@ -81,11 +81,12 @@ class Bot30Client(discord.Client):
             self.bot_user,
             channel.name,
         )
-        async for msg in channel.history(limit=limit):
-            author = msg.author
-            author_user = f"{author.name}#{author.discriminator}"
-            if author.bot and author_user == self.bot_user:
-                messages.append(msg)
+        with span("history"):
+            async for msg in channel.history(limit=limit):
+                author = msg.author
+                author_user = f"{author.name}#{author.discriminator}"
+                if author.bot and author_user == self.bot_user:
+                    messages.append(msg)
         logger.info("Found [%s] messages", len(messages))
         return messages
 
@@ -95,13 +96,25 @@ class Bot30Client(discord.Client):
         embed_title: str,
         limit: int = 5,
     ) -> discord.Message | None:
+        messages = await self._find_messages_by_embed_titles(
+            channel, [embed_title], limit=limit
+        )
+        return messages[embed_title]
+
+    async def _find_messages_by_embed_titles(
+        self,
+        channel: discord.TextChannel,
+        embed_titles: list[str],
+        limit: int = 5,
+    ) -> dict[str, discord.Message | None]:
         messages = await self._last_messages(channel, limit=limit)
-        logger.info("Looking for message with the %r embed title", embed_title)
+        logger.info("Looking for messages with the %r embed titles", embed_titles)
+        result: dict[str, discord.Message | None] = dict.fromkeys(embed_titles)
         for msg in messages:
             for embed in msg.embeds:
-                if embed.title == embed_title:
-                    return msg
-        return None
+                if embed.title in result and result[embed.title] is None:
+                    result[embed.title] = msg
+        return result
 
     async def fetch_embed_message(
         self,
@@ -117,91 +130,23 @@ class Bot30Client(discord.Client):
         )
         return channel, message
 
-    def __str__(self) -> str:
-        return f"Bot30Client(bot_user={self.bot_user!r}, server={self.server_name!r})"
-
-
-class RCONClientError(Exception):
-    pass
-
-
-class RCONStreamNotConnectedError(RCONClientError):
-    pass
-
-
-class RCONClient:
-    CMD_PREFIX = b"\xff" * 4
-    REPLY_PREFIX = CMD_PREFIX + b"print\n"
-    ENCODING = "latin-1"
-
-    def __init__(self, host: str, port: int, rcon_pass: str) -> None:
-        self.host = host
-        self.port = port
-        self.rcon_pass = rcon_pass
-        self.stream: asyncio_dgram.DatagramClient | None = None
-
-    async def connect(self) -> None:
-        if self.stream is None:
-            self.stream = await asyncio_dgram.connect((self.host, self.port))
-
-    def _create_rcon_cmd(self, cmd: str) -> bytes:
-        return self.CMD_PREFIX + f'rcon "{self.rcon_pass}" {cmd}\n'.encode(
-            self.ENCODING
+    async def fetch_embed_messages(
+        self,
+        channel_name: str,
+        embed_titles: list[str],
+        limit: int = 5,
+    ) -> tuple[discord.TextChannel, dict[str, discord.Message | None]]:
+        """
+        Finds the messages for all the embed titles with a single channel
+        lookup and history scan.
+        """
+        channel = await self._channel_by_name(channel_name)
+        messages = await self._find_messages_by_embed_titles(
+            channel=channel,
+            embed_titles=embed_titles,
+            limit=limit,
         )
+        return channel, messages
 
-    async def _send_rcon(self, cmd: str, timeout: float, retries: int) -> str:
-        if self.stream is None:
-            raise RCONStreamNotConnectedError
-        rcon_cmd = self._create_rcon_cmd(cmd)
-        for i in range(1, retries + 1):
-            await self.stream.send(rcon_cmd)
-            data = await self._receive(timeout=timeout)
-            if data:
-                return data.decode(self.ENCODING)
-
-            logger.warning("RCON %s: no data on try %s", cmd, i)
-            await asyncio.sleep(timeout * i + 1)
-
-        raise RCONClientError("NO_DATA", cmd)
-
-    async def _receive(self, timeout: float = 0.5) -> bytearray:
-        if self.stream is None:
-            raise RCONStreamNotConnectedError
-        result = bytearray()
-        while True:
-            try:
-                data, _ = await asyncio.wait_for(
-                    self.stream.recv(),
-                    timeout=timeout,
-                )
-                result += data.replace(self.REPLY_PREFIX, b"", 1)
-            except asyncio.TimeoutError:
-                break
-        return result
-
-    async def server_info(
-        self,
-        *,
-        timeout: float = 0.75,
-        retries: int = 3,
-    ) -> Server:
-        cmd = "players"
-        data = await self._send_rcon(cmd, timeout, retries)
-        logger.debug("RCON %s payload:\n%s", cmd, data)
-        return Server.from_string(data)
-
-    async def close(self) -> None:
-        if self.stream is not None:
-            self.stream.close()
-
-    async def __aenter__(self) -> Self:
-        await self.connect()
-        return self
-
-    async def __aexit__(
-        self,
-        exc_type: type[BaseException] | None,
-        exc_val: BaseException,
-        exc_tb: TracebackType,
-    ) -> None:
-        await self.close()
+    def __str__(self) -> str:
+        return f"Bot30Client(bot_user={self.bot_user!r}, server={self.server_name!r})"
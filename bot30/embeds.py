@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable
+from typing import TYPE_CHECKING
+
+from .profiling import span
+
+if TYPE_CHECKING:
+    import discord
+
+logger = logging.getLogger(__name__)
+
+
+def embed_content_changed(message: discord.Message, embed: discord.Embed) -> bool:
+    """
+    Compares the description and the fields after the first one, which only
+    holds the updated timestamp.
+    """
+    curr_embed = message.embeds[0]
+    curr_txt = curr_embed.description if curr_embed.description else ""
+    new_txt = embed.description if embed.description else ""
+    if curr_txt.strip() != new_txt.strip():
+        return True
+    return [f.value for f in curr_embed.fields[1:]] != [
+        f.value for f in embed.fields[1:]
+    ]
+
+
+async def publish_embed(
+    channel: discord.TextChannel,
+    message: discord.Message | None,
+    embed: discord.Embed,
+    should_update: Callable[
+        [discord.Message, discord.Embed], bool
+    ] = embed_content_changed,
+) -> discord.Message:
+    """
+    Edits the existing message if the embed changed, or sends a new one, and
+    returns the message now holding the embed.
+    """
+    if message:
+        if should_update(message, embed):
+            logger.info("Updating existing %r message: %s", embed.title, message.id)
+            with span("edit"):
+                return await message.edit(embed=embed)
+        logger.info("Existing %r message embed is up to date", embed.title)
+        return message
+
+    logger.info("Sending new %r message", embed.title)
+    with span("send"):
+        return await channel.send(embed=embed)
@@ -0,0 +1,14 @@
+import json
+from pathlib import Path
+from typing import Any
+
+
+def write_json_atomic(path: str | Path, data: Any) -> None:
+    """
+    Writes the data as JSON to a temporary file next to `path` and then moves
+    it in place, so readers never see a partially written file.
+    """
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(json.dumps(data), "utf-8")
+    tmp_path.replace(path)
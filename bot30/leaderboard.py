@@ -0,0 +1,164 @@
+import heapq
+import json
+import logging
+from collections import deque
+from pathlib import Path
+from typing import Any, NamedTuple, Self
+
+from .files import write_json_atomic
+from .models import PlayerScore
+from .sessions import NO_AUTH, SessionTracker
+
+logger = logging.getLogger(__name__)
+
+
+class LeaderboardEntry(NamedTuple):
+    name: str
+    kills: int
+    deaths: int
+    assists: int
+
+    @property
+    def rank_key(self) -> tuple[int, int, int, str]:
+        # same ordering as the in game scoreboard, see `Player.__lt__`
+        return self.kills, self.deaths * -1, self.assists, self.name
+
+
+class Leaderboard:
+    """
+    Running per-player score totals over a rolling time window. Score deltas
+    are added to the current time bucket and to the totals, when a bucket
+    falls out of the window its scores are subtracted again, so the cost of
+    an update does not depend on how much history is kept.
+    """
+
+    def __init__(self, window: float, bucket_size: float = 3600) -> None:
+        self.window = window
+        self.bucket_size = bucket_size
+        # (bucket number, {player key: [kills, deaths, assists]})
+        self._buckets: deque[tuple[int, dict[str, list[int]]]] = deque()
+        self._totals: dict[str, list[int]] = {}
+        self._names: dict[str, str] = {}
+        # number of buckets holding scores for each player
+        self._refs: dict[str, int] = {}
+        # set when scores were added since last saved
+        self.changed = False
+
+    def _bucket(self, now: float) -> dict[str, list[int]]:
+        number = int(now // self.bucket_size)
+        if not self._buckets or self._buckets[-1][0] != number:
+            self._buckets.append((number, {}))
+        return self._buckets[-1][1]
+
+    def add(self, key: str, name: str, delta: PlayerScore, now: float) -> None:
+        bucket = self._bucket(now)
+        if key not in bucket:
+            bucket[key] = [0, 0, 0]
+            self._refs[key] = self._refs.get(key, 0) + 1
+        for scores in (bucket[key], self._totals.setdefault(key, [0, 0, 0])):
+            scores[0] += delta.kills
+            scores[1] += delta.deaths
+            scores[2] += delta.assists
+        self._names[key] = name
+        self.changed = True
+
+    def add_sessions(self, sessions: SessionTracker, now: float) -> bool:
+        """
+        Folds the score deltas of the last poll into the leaderboard, returns
+        whether anything changed. Buckets outside of the window are dropped
+        first so the saved leaderboard does not keep growing.
+        """
+        self.expire(now)
+        changed = False
+        for sess in sessions.sessions.values():
+            if not any(sess.last_delta):
+                continue
+            key = sess.name if sess.auth in NO_AUTH else sess.auth
+            self.add(key, sess.name, sess.last_delta, now)
+            changed = True
+        return changed
+
+    def expire(self, now: float) -> None:
+        # buckets are dropped once they are entirely outside of the window
+        cutoff = now - self.window
+        while self._buckets and (self._buckets[0][0] + 1) * self.bucket_size <= cutoff:
+            _, bucket = self._buckets.popleft()
+            self.changed = True
+            for key, (kills, deaths, assists) in bucket.items():
+                scores = self._totals[key]
+                scores[0] -= kills
+                scores[1] -= deaths
+                scores[2] -= assists
+                self._refs[key] -= 1
+                if not self._refs[key]:
+                    del self._totals[key]
+                    del self._names[key]
+                    del self._refs[key]
+
+    def top(self, n: int, now: float) -> list[LeaderboardEntry]:
+        self.expire(now)
+        entries = (
+            LeaderboardEntry(self._names[key], *scores)
+            for key, scores in self._totals.items()
+        )
+        return heapq.nlargest(n, entries, key=lambda e: e.rank_key)
+
+    def __len__(self) -> int:
+        return len(self._totals)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "bucket_size": self.bucket_size,
+            "names": self._names,
+            "buckets": [[number, bucket] for number, bucket in self._buckets],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any], window: float) -> Self:
+        leaderboard = cls(window, data["bucket_size"])
+        for number, bucket in data["buckets"]:
+            leaderboard._buckets.append((number, bucket))
+            for key, (kills, deaths, assists) in bucket.items():
+                scores = leaderboard._totals.setdefault(key, [0, 0, 0])
+                scores[0] += kills
+                scores[1] += deaths
+                scores[2] += assists
+                leaderboard._names[key] = data["names"].get(key, key)
+                leaderboard._refs[key] = leaderboard._refs.get(key, 0) + 1
+        return leaderboard
+
+
+def load_leaderboard(
+    leaderboard_file: str,
+    window: float,
+    bucket_size: float,
+    sessions: SessionTracker | None = None,
+) -> Leaderboard:
+    """
+    Loads the saved leaderboard, the player scores saved along with it are
+    restored into `sessions` when given.
+    """
+    try:
+        data = json.loads(Path(leaderboard_file).read_text("utf-8"))
+        if sessions is not None and "sessions" in data:
+            sessions.restore(data["sessions"])
+        if data["bucket_size"] == bucket_size:
+            return Leaderboard.from_dict(data, window)
+        logger.warning("Leaderboard bucket size changed, starting over")
+    except FileNotFoundError:
+        pass
+    except Exception:
+        logger.exception("Ignoring invalid leaderboard file: %s", leaderboard_file)
+    return Leaderboard(window, bucket_size)
+
+
+def save_leaderboard(
+    leaderboard_file: str,
+    leaderboard: Leaderboard,
+    sessions: SessionTracker | None = None,
+) -> None:
+    data = leaderboard.to_dict()
+    if sessions is not None:
+        data["sessions"] = sessions.to_dict()
+    write_json_atomic(leaderboard_file, data)
+    leaderboard.changed = False
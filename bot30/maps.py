@@ -0,0 +1,150 @@
+import json
+import logging
+import zipfile
+from collections.abc import Iterable
+from pathlib import Path, PurePosixPath
+from typing import Any, NamedTuple
+
+from .files import write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION = 1
+LEVELSHOT_SUFFIXES = (".jpg", ".jpeg", ".tga", ".png")
+
+
+class MapInfo(NamedTuple):
+    name: str
+    pk3: str
+    levelshot: str | None
+
+
+class Pk3Entry(NamedTuple):
+    mtime_ns: int
+    size: int
+    maps: list[str]
+    levelshots: list[str]
+
+
+def scan_pk3(path: Path) -> tuple[list[str], list[str]]:
+    """
+    Lists the `.bsp` maps and levelshots contained in the archive, only the
+    zip central directory is read.
+    """
+    maps = []
+    levelshots = []
+    with zipfile.ZipFile(path) as zf:
+        for name in zf.namelist():
+            p = PurePosixPath(name)
+            parent = p.parent.name.lower()
+            suffix = p.suffix.lower()
+            if parent == "maps" and suffix == ".bsp":
+                maps.append(p.stem)
+            elif parent == "levelshots" and suffix in LEVELSHOT_SUFFIXES:
+                levelshots.append(name)
+    return maps, levelshots
+
+
+class MapCatalog:
+    def __init__(self, pk3s: dict[str, Pk3Entry]) -> None:
+        self.pk3s = pk3s
+        self.maps: dict[str, MapInfo] = {}
+        for pk3_name in sorted(pk3s):
+            entry = pk3s[pk3_name]
+            shots = {PurePosixPath(s).stem.lower(): s for s in entry.levelshots}
+            for map_name in entry.maps:
+                key = map_name.lower()
+                if key not in self.maps:
+                    self.maps[key] = MapInfo(map_name, pk3_name, shots.get(key))
+
+    def __contains__(self, map_name: object) -> bool:
+        return isinstance(map_name, str) and map_name.lower() in self.maps
+
+    def __len__(self) -> int:
+        return len(self.maps)
+
+    def get(self, map_name: str) -> MapInfo | None:
+        return self.maps.get(map_name.lower())
+
+    def missing(self, map_names: Iterable[str]) -> list[str]:
+        return [m for m in map_names if m not in self]
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "version": CACHE_VERSION,
+            "pk3s": {k: v._asdict() for k, v in self.pk3s.items()},
+        }
+
+
+def _load_cache(cache_file: Path) -> dict[str, Pk3Entry]:
+    try:
+        data = json.loads(cache_file.read_text("utf-8"))
+        if data.get("version") != CACHE_VERSION:
+            return {}
+        return {k: Pk3Entry(**v) for k, v in data["pk3s"].items()}
+    except FileNotFoundError:
+        return {}
+    except Exception:
+        logger.exception("Ignoring invalid map catalog cache: %s", cache_file)
+        return {}
+
+
+def load_catalog(
+    maps_dir: str,
+    cache_file: str | None = None,
+    previous: MapCatalog | None = None,
+) -> MapCatalog:
+    """
+    Builds the catalog of maps in the `.pk3` files found in the directory.
+    Archives are only opened when their mtime or size differ from the
+    cached entry, the `previous` catalog is used as the cache when given and
+    returned as is if no archive changed.
+    """
+    if previous is not None:
+        cached = previous.pk3s
+    else:
+        cached = _load_cache(Path(cache_file)) if cache_file else {}
+    pk3s: dict[str, Pk3Entry] = {}
+    scanned = 0
+    for path in sorted(Path(maps_dir).glob("*.pk3")):
+        st = path.stat()
+        entry = cached.get(path.name)
+        if entry is None or (entry.mtime_ns, entry.size) != (
+            st.st_mtime_ns,
+            st.st_size,
+        ):
+            try:
+                maps, levelshots = scan_pk3(path)
+            except (OSError, zipfile.BadZipFile):
+                logger.exception("Failed to read pk3: %s", path)
+                continue
+            entry = Pk3Entry(st.st_mtime_ns, st.st_size, maps, levelshots)
+            scanned += 1
+        pk3s[path.name] = entry
+
+    if previous is not None and pk3s == previous.pk3s:
+        return previous
+    catalog = MapCatalog(pk3s)
+    logger.info(
+        "Map catalog has %s maps from %s pk3s (%s scanned)",
+        len(catalog),
+        len(pk3s),
+        scanned,
+    )
+    if cache_file and pk3s != cached:
+        write_json_atomic(cache_file, catalog.to_dict())
+    return catalog
+
+
+# last catalog loaded for each maps dir
+_catalogs: dict[str, MapCatalog] = {}
+
+
+def load_catalog_cached(maps_dir: str, cache_file: str | None = None) -> MapCatalog:
+    """
+    Same as `load_catalog`, but the catalog is kept in memory and only
+    rebuilt once an archive is added, removed or modified.
+    """
+    catalog = load_catalog(maps_dir, cache_file, _catalogs.get(maps_dir))
+    _catalogs[maps_dir] = catalog
+    return catalog
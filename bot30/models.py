@@ -2,6 +2,7 @@ import dataclasses
 import enum
 import functools
 import re
+from collections.abc import Iterable
 from typing import Any, NamedTuple, Self
 
 
@@ -11,6 +12,29 @@ class PlayerScore(NamedTuple):
     assists: int
 
 
+class ParseDiagnostic(NamedTuple):
+    # 1-based line number within the reply, 0 for the reply as a whole
+    line_no: int
+    reason: str
+    line: str
+
+
+class ParseError(ValueError):
+    """Raised for a reply line that cannot be parsed."""
+
+    def __init__(self, diagnostic: ParseDiagnostic) -> None:
+        super().__init__(diagnostic.line)
+        self.diagnostic = diagnostic
+
+
+class ServerParseError(RuntimeError):
+    """Raised when a reply as a whole is inconsistent, such as a count mismatch."""
+
+    def __init__(self, *args: str, diagnostics: list[ParseDiagnostic]) -> None:
+        super().__init__(*args)
+        self.diagnostics = diagnostics
+
+
 class GameType(enum.Enum):
     FFA = "0"
     LMS = "1"
@@ -42,6 +66,7 @@ class Player:
         re.IGNORECASE,
     )
 
+    slot: int
     name: str
     team: str
     score: PlayerScore
@@ -72,12 +97,13 @@ class Player:
         )
 
     @classmethod
-    def from_string(cls, data: str) -> Self:
+    def from_string(cls, data: str, line_no: int = 0) -> Self:
         if m := re.match(Player.RE_PLAYER, data.strip()):
             name = re.sub(Player.RE_COLOR, "", m["name"])
             score = PlayerScore._make(int(m[x]) for x in PlayerScore._fields)
             ping = -1 if m["ping"] in ("CNCT", "ZMBI") else int(m["ping"])
             return cls(
+                slot=int(m["slot"]),
                 name=name,
                 team=m["team"],
                 score=score,
@@ -85,13 +111,14 @@ class Player:
                 auth=m["auth"],
                 ip_address=m["ip_address"],
             )
-        raise ValueError(data)
+        raise ParseError(ParseDiagnostic(line_no, "INVALID_PLAYER", data))
 
     def __repr__(self) -> str:
         return (
             "Player("
-            f"name={self.name}, team={self.team}, score={self.score}, "
-            f"ping={self.ping}, auth={self.auth}, ip_address={self.ip_address}"
+            f"slot={self.slot}, name={self.name}, team={self.team}, "
+            f"score={self.score}, ping={self.ping}, auth={self.auth}, "
+            f"ip_address={self.ip_address}"
             ")"
         )
 
@@ -99,9 +126,21 @@ class Player:
 class Server:
     RE_SCORES = re.compile(r"\s*R:(?P<red>\d+)\s+B:(?P<blue>\d+)")
 
+    # header settings needed to render the server, a reply missing any of
+    # them cannot be recovered
+    REQUIRED_SETTINGS = ("Map", "Players", "GameTime")
+    # formats of the required settings that are parsed further
+    RE_SETTINGS = {
+        "Players": re.compile(r"\d+"),
+        "GameTime": re.compile(r"\d+:\d+:\d+"),
+    }
+
     def __init__(self) -> None:
         self.settings: dict[str, str] = {}
         self.players: list[Player] = []
+        # set by a tolerant parse that had to skip lines or players are missing
+        self.partial = False
+        self.diagnostics: list[ParseDiagnostic] = []
 
     @property
     def map_name(self) -> str:
@@ -161,37 +200,89 @@ class Server:
         return self._get_team("BLUE")
 
     @classmethod
-    def from_string(cls, data: str) -> Self:
+    def from_string(cls, data: str, *, tolerant: bool = False) -> Self:
+        return cls.from_lines(data.splitlines(), tolerant=tolerant)
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[str], *, tolerant: bool = False) -> Self:
+        """
+        Parses the `players` reply. By default any bad line or a player count
+        mismatch raises, when `tolerant` bad lines are skipped instead and the
+        server is returned flagged as `partial`, with the problems recorded in
+        `diagnostics`, leaving it to the caller to decide whether to use it.
+        A tolerant parse of a reply without the header settings needed to
+        render it, or with any of them corrupt, raises.
+        """
         server = cls()
         in_header = True
-        for line in data.splitlines():
-            k, v = line.split(":", maxsplit=1)
-            if in_header:
-                server.settings[k] = v.strip()
-                if k == "GameTime":
-                    in_header = False
-            elif k.isnumeric():
-                player = Player.from_string(line)
-                server.players.append(player)
-            elif k == "Map":
-                # back-to-back messages, start over
-                server.settings[k] = v.strip()
-                in_header = True
+        for line_no, line in enumerate(lines, 1):
+            try:
+                k, v = server._parse_line(line, line_no)
+                if in_header:
+                    server.settings[k] = v.strip()
+                    if k == "GameTime":
+                        in_header = False
+                elif k.isnumeric():
+                    player = Player.from_string(line, line_no)
+                    server.players.append(player)
+                elif k == "Map":
+                    # back-to-back messages, start over
+                    server.settings[k] = v.strip()
+                    in_header = True
+            except ParseError as exc:
+                if not tolerant:
+                    raise
+                server.diagnostics.append(exc.diagnostic)
+
+        if tolerant and (invalid := server._check_settings()):
+            raise ServerParseError(
+                invalid[0].reason,
+                diagnostics=[*server.diagnostics, *invalid],
+            )
 
         if server.player_count != len(server.players):
             msg = (
                 f"Player count {server.player_count} does not match "
                 f"players {len(server.players)}"
-                f"\n\n{data}"
             )
-            raise RuntimeError(msg)
+            diagnostic = ParseDiagnostic(0, "PLAYER_COUNT_MISMATCH", msg)
+            if not tolerant:
+                raise ServerParseError(
+                    msg,
+                    diagnostics=[*server.diagnostics, diagnostic],
+                )
+            server.diagnostics.append(diagnostic)
 
         if not server.map_name:
-            raise RuntimeError("MAP_NOT_SET", data)
+            raise ServerParseError(
+                "MAP_NOT_SET",
+                diagnostics=[
+                    *server.diagnostics,
+                    ParseDiagnostic(0, "MAP_NOT_SET", ""),
+                ],
+            )
 
+        server.partial = bool(server.diagnostics)
         server.players.sort(reverse=True)
         return server
 
+    def _check_settings(self) -> list[ParseDiagnostic]:
+        """The problems with the header settings needed to render the server."""
+        if missing := [k for k in self.REQUIRED_SETTINGS if k not in self.settings]:
+            return [ParseDiagnostic(0, "MISSING_SETTINGS", ", ".join(missing))]
+        return [
+            ParseDiagnostic(0, "INVALID_SETTING", f"{k}: {self.settings[k]}")
+            for k, pattern in self.RE_SETTINGS.items()
+            if not pattern.fullmatch(self.settings[k])
+        ]
+
+    @staticmethod
+    def _parse_line(line: str, line_no: int) -> tuple[str, str]:
+        k, sep, v = line.partition(":")
+        if not sep:
+            raise ParseError(ParseDiagnostic(line_no, "MISSING_SEPARATOR", line))
+        return k, v
+
     def __str__(self) -> str:
         return (
             "Server("
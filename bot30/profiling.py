@@ -0,0 +1,136 @@
+import asyncio
+import contextlib
+import contextvars
+import cProfile
+import io
+import logging
+import pstats
+import time
+from collections.abc import AsyncIterator, Iterator
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import NamedTuple
+
+logger = logging.getLogger(__name__)
+
+
+class Span(NamedTuple):
+    name: str
+    start: float
+    duration: float
+    error: str | None
+
+
+class _SlowCallbackHandler(logging.Handler):
+    """Collects the slow callback warnings emitted by asyncio in debug mode."""
+
+    def __init__(self) -> None:
+        super().__init__(level=logging.WARNING)
+        self.messages: list[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.messages.append(record.getMessage())
+
+
+class RunProfile:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.started = time.perf_counter()
+        self.spans: list[Span] = []
+        self.slow_callbacks: list[str] = []
+        self.profiler = cProfile.Profile()
+
+    def report(self, top: int = 30) -> str:
+        total = time.perf_counter() - self.started
+        out = io.StringIO()
+        out.write(f"{self.name}: {total:.3f}s total\n\n")
+        out.write(f"{'offset':>9} {'duration':>9}  span\n")
+        for s in sorted(self.spans, key=lambda x: x.start):
+            error = f"  [{s.error}]" if s.error else ""
+            out.write(f"{s.start:9.3f} {s.duration:9.3f}  {s.name}{error}\n")
+        out.write(f"\nSlow callbacks ({len(self.slow_callbacks)}):\n")
+        for msg in self.slow_callbacks:
+            out.write(f"  {msg}\n")
+        out.write("\n")
+        stats = pstats.Stats(self.profiler, stream=out)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top)
+        return out.getvalue()
+
+
+_current: contextvars.ContextVar[RunProfile | None] = contextvars.ContextVar(
+    "bot30_profile", default=None
+)
+
+
+@contextlib.contextmanager
+def span(name: str) -> Iterator[None]:
+    """
+    Records the wall clock time spent in the block when a profiled run is
+    active, otherwise does nothing.
+    """
+    if (profile := _current.get()) is None:
+        yield
+        return
+    start = time.perf_counter()
+    error = None
+    try:
+        yield
+    except BaseException as exc:
+        error = type(exc).__name__
+        raise
+    finally:
+        end = time.perf_counter()
+        profile.spans.append(Span(name, start - profile.started, end - start, error))
+
+
+@contextlib.asynccontextmanager
+async def profile_run(
+    name: str,
+    report_dir: str | None,
+    slow_callback_duration: float = 0.1,
+) -> AsyncIterator[None]:
+    """
+    Profiles the enclosed run when a report directory is given. The asyncio
+    slow callback reporting is enabled and a cProfile along with the recorded
+    spans is written to the directory once the run ends, even on failure.
+    """
+    if not report_dir:
+        yield
+        return
+
+    loop = asyncio.get_running_loop()
+    prev_debug = loop.get_debug()
+    prev_slow_duration = loop.slow_callback_duration
+    loop.set_debug(enabled=True)
+    loop.slow_callback_duration = slow_callback_duration
+    handler = _SlowCallbackHandler()
+    asyncio_logger = logging.getLogger("asyncio")
+    asyncio_logger.addHandler(handler)
+
+    profile = RunProfile(name)
+    token = _current.set(profile)
+    profile.profiler.enable()
+    try:
+        with span("run"):
+            yield
+    finally:
+        profile.profiler.disable()
+        _current.reset(token)
+        asyncio_logger.removeHandler(handler)
+        loop.set_debug(prev_debug)
+        loop.slow_callback_duration = prev_slow_duration
+        profile.slow_callbacks = handler.messages
+        _write_report(profile, Path(report_dir))
+
+
+def _write_report(profile: RunProfile, report_dir: Path) -> None:
+    stamp = datetime.now(UTC).strftime("%Y%m%dT%H%M%S")
+    base = report_dir / f"{profile.name}-{stamp}"
+    try:
+        report_dir.mkdir(parents=True, exist_ok=True)
+        profile.profiler.dump_stats(base.with_suffix(".prof"))
+        base.with_suffix(".txt").write_text(profile.report(), "utf-8")
+    except Exception:
+        logger.exception("Failed to write profile report: %s", base)
+    else:
+        logger.info("Profile report written to: %s.txt", base)
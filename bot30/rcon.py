@@ -0,0 +1,282 @@
+import asyncio
+import contextlib
+import logging
+from collections.abc import AsyncIterator, Iterator
+from types import TracebackType
+from typing import Self, cast
+
+import asyncio_dgram
+from asyncio_dgram.aio import TransportClosed  # type: ignore[attr-defined]
+
+from .capture import capture_reply
+from .models import Server
+from .profiling import span
+
+logger = logging.getLogger(__name__)
+
+
+class RCONClientError(Exception):
+    pass
+
+
+class RCONStreamNotConnectedError(RCONClientError):
+    pass
+
+
+class RCONClient:
+    CMD_PREFIX = b"\xff" * 4
+    REPLY_PREFIX = CMD_PREFIX + b"print\n"
+    REPLY_START = b"Map:"
+    ENCODING = "latin-1"
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        rcon_pass: str,
+        capture_dir: str | None = None,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.rcon_pass = rcon_pass
+        self.capture_dir = capture_dir
+        self.stream: asyncio_dgram.DatagramClient | None = None
+
+    async def connect(self) -> None:
+        if self.stream is None:
+            self.stream = await asyncio_dgram.connect((self.host, self.port))
+
+    def _create_rcon_cmd(self, cmd: str) -> bytes:
+        return self.CMD_PREFIX + f'rcon "{self.rcon_pass}" {cmd}\n'.encode(
+            self.ENCODING
+        )
+
+    async def _send_rcon(self, cmd: str, timeout: float, retries: int) -> list[bytes]:
+        if self.stream is None:
+            raise RCONStreamNotConnectedError
+        rcon_cmd = self._create_rcon_cmd(cmd)
+        for i in range(1, retries + 1):
+            try:
+                await self.stream.send(rcon_cmd)
+                if datagrams := await self._receive(timeout=timeout):
+                    return datagrams
+            except (OSError, TransportClosed) as exc:
+                # most likely an ICMP port unreachable from the last send
+                logger.warning("RCON %s: %r on try %s", cmd, exc, i)
+                await self.reconnect()
+            else:
+                logger.warning("RCON %s: no data on try %s", cmd, i)
+            await asyncio.sleep(timeout * i + 1)
+
+        raise RCONClientError("NO_DATA", cmd)
+
+    async def _receive(self, timeout: float = 0.5) -> list[bytes]:
+        """Collects the reply datagrams as they arrive, until `timeout`."""
+        if self.stream is None:
+            raise RCONStreamNotConnectedError
+        datagrams: list[bytes] = []
+        while True:
+            try:
+                data, _ = await asyncio.wait_for(
+                    self.stream.recv(),
+                    timeout=timeout,
+                )
+            except asyncio.TimeoutError:
+                break
+            datagrams.append(data)
+        return datagrams
+
+    @classmethod
+    def reassemble(cls, datagrams: list[bytes]) -> list[memoryview]:
+        """
+        Returns the reply fragments as views over the datagram bytes with the
+        reply header sliced off. Duplicate datagrams are dropped and the
+        fragment starting the reply is moved to the front if it arrived late.
+        """
+        fragments: list[memoryview] = []
+        seen: set[bytes] = set()
+        has_header = False
+        for data in datagrams:
+            if data in seen:
+                logger.debug("RCON dropping duplicate datagram")
+                continue
+            seen.add(data)
+            view = memoryview(data)
+            if data.startswith(cls.REPLY_PREFIX):
+                view = view[len(cls.REPLY_PREFIX) :]
+            is_start = view[: len(cls.REPLY_START)] == cls.REPLY_START
+            if is_start and not has_header:
+                has_header = True
+                fragments.insert(0, view)
+            else:
+                fragments.append(view)
+        return fragments
+
+    @classmethod
+    def iter_lines(cls, fragments: list[memoryview]) -> Iterator[str]:
+        """
+        Yields the decoded lines from the reply fragments, only a line split
+        across two datagrams is copied before being decoded.
+        """
+        partial = b""
+        for view in fragments:
+            data = cast(bytes, view.obj)
+            # the view is always a suffix of the datagram bytes
+            offset = len(data) - view.nbytes
+            pos = 0
+            while (end := data.find(b"\n", offset + pos)) != -1:
+                line = view[pos : end - offset]
+                if partial:
+                    yield (partial + line).decode(cls.ENCODING)
+                    partial = b""
+                else:
+                    yield str(line, cls.ENCODING)
+                pos = end - offset + 1
+            if pos < view.nbytes:
+                partial += view[pos:]
+        if partial:
+            yield partial.decode(cls.ENCODING)
+
+    async def players(
+        self,
+        *,
+        timeout: float = 0.75,
+        retries: int = 3,
+    ) -> list[memoryview]:
+        """Returns the raw `players` reply, for parsing with `iter_lines`."""
+        cmd = "players"
+        with span(f"rcon_{cmd}"):
+            datagrams = await self._send_rcon(cmd, timeout, retries)
+        if self.capture_dir:
+            capture_reply(self.capture_dir, cmd, datagrams)
+        fragments = self.reassemble(datagrams)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "RCON %s payload:\n%s", cmd, b"".join(fragments).decode(self.ENCODING)
+            )
+        return fragments
+
+    async def server_info(
+        self,
+        *,
+        timeout: float = 0.75,
+        retries: int = 3,
+        tolerant: bool = False,
+    ) -> Server:
+        fragments = await self.players(timeout=timeout, retries=retries)
+        return Server.from_lines(self.iter_lines(fragments), tolerant=tolerant)
+
+    async def drain(self) -> int:
+        """
+        Discards any datagrams already received, such as late replies to an
+        earlier request that timed out, and returns how many were dropped.
+        Errors reported by the socket since the last request are raised.
+        """
+        if self.stream is None:
+            raise RCONStreamNotConnectedError
+        count = 0
+        while True:
+            task = asyncio.create_task(self.stream.recv())
+            # lets the task run once, it is only done if data was queued
+            await asyncio.sleep(0)
+            if not task.done():
+                task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await task
+                return count
+            task.result()
+            count += 1
+
+    async def reconnect(self) -> None:
+        await self.close()
+        await self.connect()
+
+    async def close(self) -> None:
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None
+
+    async def __aenter__(self) -> Self:
+        await self.connect()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException,
+        exc_tb: TracebackType,
+    ) -> None:
+        await self.close()
+
+
+class _ServerConnections:
+    def __init__(self, max_connections: int) -> None:
+        self.semaphore = asyncio.Semaphore(max_connections)
+        self.idle: list[RCONClient] = []
+
+
+class RCONConnectionPool:
+    """
+    Keeps RCON connections open across polls, keyed by (host, port). Each
+    server gets at most `max_connections` concurrent requests, and since a
+    reply can not be matched to its request, a connection is only ever used
+    by one request at a time.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 1,
+        capture_dir: str | None = None,
+    ) -> None:
+        self.max_connections = max_connections
+        self.capture_dir = capture_dir
+        self._servers: dict[tuple[str, int], _ServerConnections] = {}
+
+    @contextlib.asynccontextmanager
+    async def client(
+        self,
+        host: str,
+        port: int,
+        rcon_pass: str,
+    ) -> AsyncIterator[RCONClient]:
+        key = (host, port)
+        if (conns := self._servers.get(key)) is None:
+            conns = self._servers[key] = _ServerConnections(self.max_connections)
+        async with conns.semaphore:
+            if conns.idle:
+                client = conns.idle.pop()
+                client.rcon_pass = rcon_pass
+            else:
+                client = RCONClient(host, port, rcon_pass, self.capture_dir)
+            try:
+                await self._check_health(client)
+                yield client
+            except (OSError, TransportClosed):
+                # reconnects on the next checkout
+                await client.close()
+                raise
+            finally:
+                conns.idle.append(client)
+
+    @staticmethod
+    async def _check_health(client: RCONClient) -> None:
+        await client.connect()
+        try:
+            if stale := await client.drain():
+                logger.debug(
+                    "RCON %s:%s: dropped %s stale datagrams",
+                    client.host,
+                    client.port,
+                    stale,
+                )
+        except (OSError, TransportClosed) as exc:
+            logger.warning(
+                "RCON %s:%s: reconnecting after %r", client.host, client.port, exc
+            )
+            await client.reconnect()
+
+    async def close(self) -> None:
+        for conns in self._servers.values():
+            while conns.idle:
+                await conns.idle.pop().close()
+        self._servers.clear()
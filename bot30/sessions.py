@@ -0,0 +1,244 @@
+import math
+from array import array
+from typing import Any
+
+from .models import Player, PlayerScore, Server
+
+# auth value reported for players that are not logged in to their account
+NO_AUTH = ("", "---")
+
+
+def _same_player(slot: int, auth: str, name: str, player: Player) -> bool:
+    if player.slot != slot:
+        return False
+    if auth in NO_AUTH or player.auth in NO_AUTH:
+        return player.auth == auth and player.name == name
+    return player.auth == auth
+
+
+def _game_seconds(server: Server) -> int | None:
+    try:
+        hours, mins, secs = server.settings["GameTime"].split(":")
+        return int(hours) * 3600 + int(mins) * 60 + int(secs)
+    except (KeyError, ValueError):
+        return None
+
+
+class RingBuffer:
+    """
+    Fixed size buffer of integer samples backed by an `array`, once full the
+    oldest sample is overwritten.
+    """
+
+    __slots__ = ("_data", "_pos", "_count")
+
+    def __init__(self, size: int, typecode: str = "l") -> None:
+        self._data = array(typecode, [0]) * size
+        self._pos = 0
+        self._count = 0
+
+    def append(self, value: int) -> None:
+        self._data[self._pos] = value
+        self._pos = (self._pos + 1) % len(self._data)
+        self._count = min(self._count + 1, len(self._data))
+
+    def __len__(self) -> int:
+        return self._count
+
+    def values(self) -> list[int]:
+        """The samples from oldest to newest."""
+        if self._count < len(self._data):
+            return self._data[: self._count].tolist()
+        return (self._data[self._pos :] + self._data[: self._pos]).tolist()
+
+    def total(self) -> int:
+        return sum(self._data[: self._count]) if self._count else 0
+
+    def mean(self) -> float | None:
+        return self.total() / self._count if self._count else None
+
+    def percentile(self, pct: float) -> int | None:
+        """Nearest rank percentile of the samples."""
+        if not self._count:
+            return None
+        ordered = sorted(self._data[: self._count])
+        rank = max(math.ceil(pct / 100 * self._count), 1)
+        return ordered[rank - 1]
+
+
+class PlayerSession:
+    """
+    Rolling statistics for a player while connected. Scores are tracked as
+    deltas between polls so that the session totals carry over map changes.
+    """
+
+    __slots__ = (
+        "slot",
+        "auth",
+        "name",
+        "started",
+        "last_seen",
+        "last_score",
+        "last_delta",
+        "kills",
+        "deaths",
+        "assists",
+        "pings",
+        "kill_deltas",
+    )
+
+    def __init__(
+        self,
+        player: Player,
+        now: float,
+        samples: int,
+        baseline: PlayerScore | None = None,
+        *,
+        new_round: bool = False,
+    ) -> None:
+        self.slot = player.slot
+        self.auth = player.auth
+        self.name = player.name
+        self.started = now
+        self.last_seen = now
+        # only the scores made after the session started, or after the score
+        # last seen by a previous run, are counted
+        self.last_score = player.score if baseline is None else baseline
+        self.last_delta = PlayerScore(0, 0, 0)
+        self.kills = 0
+        self.deaths = 0
+        self.assists = 0
+        self.pings = RingBuffer(samples, "h")
+        self.kill_deltas = RingBuffer(samples, "h")
+        self.update(player, now, new_round=new_round and baseline is not None)
+
+    def matches(self, player: Player) -> bool:
+        return _same_player(self.slot, self.auth, self.name, player)
+
+    def update(self, player: Player, now: float, *, new_round: bool = False) -> None:
+        score, last = player.score, self.last_score
+        if (
+            new_round
+            or score.deaths < last.deaths
+            or score.assists < last.assists
+            or (score == (0, 0, 0) and last != score)
+        ):
+            # scores were reset, a new map or round
+            last = PlayerScore(0, 0, 0)
+        delta = PlayerScore(
+            score.kills - last.kills,
+            score.deaths - last.deaths,
+            score.assists - last.assists,
+        )
+        self.kills += delta.kills
+        self.deaths += delta.deaths
+        self.assists += delta.assists
+        self.kill_deltas.append(delta.kills)
+        self.last_delta = delta
+        if player.ping >= 0:
+            self.pings.append(min(player.ping, 32767))
+        self.last_score = score
+        self.name = player.name
+        self.last_seen = now
+
+    @property
+    def avg_ping(self) -> float | None:
+        return self.pings.mean()
+
+    @property
+    def p95_ping(self) -> int | None:
+        return self.pings.percentile(95)
+
+    @property
+    def recent_kills(self) -> int:
+        """Kills over the sampled window."""
+        return self.kill_deltas.total()
+
+    @property
+    def kd_ratio(self) -> float:
+        return self.kills / self.deaths if self.deaths else float(self.kills)
+
+
+class SessionTracker:
+    """
+    Matches players across polls by slot, auth and name. Only connected
+    players are tracked so memory is bounded by the server slots.
+    """
+
+    def __init__(self, samples: int = 60) -> None:
+        self.samples = samples
+        self.sessions: dict[int, PlayerSession] = {}
+        self.map_name: str | None = None
+        self.game_time: int | None = None
+        # scores last seen by a previous run, by slot, see `restore`
+        self.baselines: dict[int, tuple[str, str, PlayerScore]] = {}
+
+    def _new_round(self, server: Server) -> bool:
+        """Whether the scores were reset since the last poll."""
+        game_time = _game_seconds(server)
+        new_round = self.map_name is not None and (
+            server.map_name != self.map_name
+            or (
+                game_time is not None
+                and self.game_time is not None
+                and game_time < self.game_time
+            )
+        )
+        self.map_name = server.map_name
+        self.game_time = game_time
+        return new_round
+
+    def _baseline(self, player: Player) -> PlayerScore | None:
+        if (baseline := self.baselines.get(player.slot)) is None:
+            return None
+        auth, name, score = baseline
+        return score if _same_player(player.slot, auth, name, player) else None
+
+    def update(self, server: Server, now: float) -> None:
+        new_round = self._new_round(server)
+        sessions = {}
+        for player in server.players:
+            sess = self.sessions.get(player.slot)
+            if sess is not None and sess.matches(player):
+                sess.update(player, now, new_round=new_round)
+            else:
+                sess = PlayerSession(
+                    player,
+                    now,
+                    self.samples,
+                    self._baseline(player),
+                    new_round=new_round,
+                )
+            sessions[player.slot] = sess
+        self.sessions = sessions
+        self.baselines = {}
+
+    def to_dict(self) -> dict[str, Any]:
+        """The last seen map, game time and scores, see `restore`."""
+        return {
+            "map_name": self.map_name,
+            "game_time": self.game_time,
+            "players": [
+                [sess.slot, sess.auth, sess.name, list(sess.last_score)]
+                for sess in self.sessions.values()
+            ],
+        }
+
+    def restore(self, data: dict[str, Any]) -> None:
+        """
+        Uses the state saved by a previous run as the baselines of the next
+        update, so that the scores made between the two runs are counted.
+        """
+        self.map_name = data["map_name"]
+        self.game_time = data["game_time"]
+        self.baselines = {
+            slot: (auth, name, PlayerScore(*score))
+            for slot, auth, name, score in data["players"]
+        }
+
+    def get(self, player: Player) -> PlayerSession | None:
+        sess = self.sessions.get(player.slot)
+        return sess if sess is not None and sess.matches(player) else None
+
+    def __len__(self) -> int:
+        return len(self.sessions)
@@ -15,18 +15,65 @@ BOT_TOKEN = os.environ["BOT_TOKEN"]
 
 # Max time in secs to allow this process to run
 BOT_MAX_RUN_TIME = int(os.getenv("BOT_MAX_RUN_TIME", "60"))
+# Directory to write per run profile reports to, profiling is off when not set
+BOT_PROFILE_DIR = os.getenv("BOT_PROFILE_DIR")
+# Callbacks blocking the event loop longer than this (in secs) are reported
+BOT_PROFILE_SLOW_CALLBACK = float(os.getenv("BOT_PROFILE_SLOW_CALLBACK", "0.1"))
 
 MAPCYCLE_EMBED_TITLE = os.environ["MAPCYCLE_EMBED_TITLE"]
 CHANNEL_NAME_MAPCYCLE = os.environ["CHANNEL_NAME_MAPCYCLE"]
 MAPCYCLE_FILE = os.environ["MAPCYCLE_FILE"]
+# Number of maps listed after the current map when it is known, 0 to disable
+MAPCYCLE_UP_NEXT = int(os.getenv("MAPCYCLE_UP_NEXT", "10"))
+# Game server `q3ut4` directory with the map pk3 files, used to validate the
+# map cycle when set
+MAPS_DIR = os.getenv("MAPS_DIR")
+MAPS_CATALOG_CACHE = os.getenv("MAPS_CATALOG_CACHE", ".maps_catalog.json")
 
 GAME_SERVER_IP = os.getenv("GAME_SERVER_IP", "127.0.0.1")
 GAME_SERVER_PORT = int(os.getenv("GAME_SERVER_PORT", "27960"))
 GAME_SERVER_RCON_PASS = os.getenv("GAME_SERVER_RCON_PASS")
+# Directory to save the raw RCON replies to for later replay, off when not set
+RCON_CAPTURE_DIR = os.getenv("RCON_CAPTURE_DIR")
+# Max concurrent RCON requests (and open connections) per game server
+RCON_MAX_CONNECTIONS = int(os.getenv("RCON_MAX_CONNECTIONS", "1"))
 
 CURRENT_MAP_EMBED_TITLE = os.environ["CURRENT_MAP_EMBED_TITLE"]
 # Delay in fractional seconds between updates when there are players online
 CURRENT_MAP_UPDATE_DELAY = float(os.getenv("CURRENT_MAP_UPDATE_DELAY", "5.0"))
+# Number of ping/score samples kept per connected player
+CURRENT_MAP_SESSION_SAMPLES = int(os.getenv("CURRENT_MAP_SESSION_SAMPLES", "120"))
+# Players whose 95th percentile ping reaches this (in ms) are flagged as lagging
+CURRENT_MAP_LAG_PING = int(os.getenv("CURRENT_MAP_LAG_PING", "250"))
+# Replies with up to this many parse problems, such as bad lines or players
+# missing from a truncated reply, are still published, 0 to reject them
+CURRENT_MAP_MAX_PARSE_ERRORS = int(os.getenv("CURRENT_MAP_MAX_PARSE_ERRORS", "4"))
+# File used to record the last published server state, set to empty to disable
+CURRENT_MAP_STATE_FILE = os.getenv("CURRENT_MAP_STATE_FILE", ".current_map_state")
+# Max age in secs of the recorded state before Discord is checked regardless
+CURRENT_MAP_STATE_MAX_AGE = float(os.getenv("CURRENT_MAP_STATE_MAX_AGE", "3600"))
+
+# Title of the top players embed, the leaderboard is off when not set
+LEADERBOARD_EMBED_TITLE = os.getenv("LEADERBOARD_EMBED_TITLE")
+LEADERBOARD_FILE = os.getenv("LEADERBOARD_FILE", ".leaderboard.json")
+# Rolling window and bucket size in secs that scores are aggregated over
+LEADERBOARD_WINDOW = float(os.getenv("LEADERBOARD_WINDOW", str(7 * 24 * 3600)))
+LEADERBOARD_BUCKET = float(os.getenv("LEADERBOARD_BUCKET", "3600"))
+LEADERBOARD_SIZE = int(os.getenv("LEADERBOARD_SIZE", "10"))
+
+# Interval in secs between runs of each updater when hosted by the scheduler
+SCHEDULER_MAPCYCLE_INTERVAL = float(os.getenv("SCHEDULER_MAPCYCLE_INTERVAL", "3600"))
+SCHEDULER_CURRENT_MAP_INTERVAL = float(
+    os.getenv("SCHEDULER_CURRENT_MAP_INTERVAL", "60")
+)
+SCHEDULER_LEADERBOARD_INTERVAL = float(
+    os.getenv("SCHEDULER_LEADERBOARD_INTERVAL", "600")
+)
+# Port for the JSON status API served by the scheduler, off when not set
+STATUS_API_HOST = os.getenv("STATUS_API_HOST", "127.0.0.1")
+STATUS_API_PORT = (
+    int(os.environ["STATUS_API_PORT"]) if os.getenv("STATUS_API_PORT") else None
+)
 
 logging.basicConfig(format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
 logging.getLogger("bot30").setLevel(LOG_LEVEL)
@@ -0,0 +1,94 @@
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Any, NamedTuple, Self
+
+from .files import write_json_atomic
+from .models import Server
+
+logger = logging.getLogger(__name__)
+
+
+class ServerFingerprint(NamedTuple):
+    map_name: str
+    game_type: str
+    players: tuple[str, ...]
+    no_players: bool
+
+    @classmethod
+    def from_server(cls, server: Server) -> Self:
+        return cls(
+            map_name=server.map_name,
+            game_type=server.game_type,
+            players=tuple(sorted(p.name for p in server.players)),
+            no_players=len(server.spectators) == server.player_count,
+        )
+
+
+class PublishedState(NamedTuple):
+    """
+    The server fingerprint along with the time (epoch secs) it was last
+    published to Discord.
+    """
+
+    fingerprint: ServerFingerprint
+    published_at: float
+
+    def is_current(self, server: Server | None, max_age: float) -> bool:
+        """
+        Whether the published message already reflects the server. Only idle
+        servers, where the embed would not change between polls, qualify.
+        """
+        return (
+            server is not None
+            and self.fingerprint.no_players
+            and time.time() - self.published_at < max_age
+            and self.fingerprint == ServerFingerprint.from_server(server)
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "fingerprint": self.fingerprint._asdict(),
+            "published_at": self.published_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> Self:
+        fp = data["fingerprint"]
+        return cls(
+            fingerprint=ServerFingerprint(
+                map_name=fp["map_name"],
+                game_type=fp["game_type"],
+                players=tuple(fp["players"]),
+                no_players=fp["no_players"],
+            ),
+            published_at=float(data["published_at"]),
+        )
+
+
+def load_state(state_file: str) -> PublishedState | None:
+    path = Path(state_file)
+    try:
+        return PublishedState.from_dict(json.loads(path.read_text("utf-8")))
+    except FileNotFoundError:
+        return None
+    except Exception:
+        logger.exception("Ignoring invalid state file: %s", state_file)
+        return None
+
+
+def save_state(state_file: str, server: Server | None) -> None:
+    """
+    Records the server as published. A missing server clears the state so
+    that the next run always goes through Discord.
+    """
+    path = Path(state_file)
+    if server is None:
+        path.unlink(missing_ok=True)
+        return
+    state = PublishedState(
+        fingerprint=ServerFingerprint.from_server(server),
+        published_at=time.time(),
+    )
+    write_json_atomic(path, state.to_dict())
@@ -0,0 +1,67 @@
+import hashlib
+import json
+import time
+from typing import Any
+
+from .models import Player, Server
+
+
+def player_to_dict(player: Player) -> dict[str, Any]:
+    # IP addresses and auth names are deliberately left out
+    return {
+        "name": player.name,
+        "kills": player.kills,
+        "deaths": player.deaths,
+        "assists": player.assists,
+        "ping": player.ping,
+    }
+
+
+def server_to_dict(server: Server) -> dict[str, Any]:
+    return {
+        "map": server.map_name,
+        "game_type": server.game_type,
+        "game_time": server.settings.get("GameTime"),
+        "player_count": server.player_count,
+        "scores": {"red": server.score_red, "blue": server.score_blue},
+        "teams": {
+            "red": [player_to_dict(p) for p in server.team_red],
+            "blue": [player_to_dict(p) for p in server.team_blue],
+            "free": [player_to_dict(p) for p in server.team_free],
+            "spectators": [player_to_dict(p) for p in server.spectators],
+        },
+    }
+
+
+class StatusSnapshot:
+    """
+    Holds the JSON body for the latest server, serialized once per change so
+    that requests only write out the prepared bytes. The snapshot is stale
+    once it has not been updated for `stale_after` secs, such as when polls
+    fail, by default three times `max_age`.
+    """
+
+    def __init__(self, max_age: int = 5, stale_after: float | None = None) -> None:
+        self.max_age = max_age
+        self.stale_after = stale_after if stale_after is not None else max_age * 3
+        self._data: dict[str, Any] | None = None
+        self.body: bytes | None = None
+        self.etag: str | None = None
+        # monotonic time of the last update, changed or not
+        self.updated_at: float | None = None
+
+    def is_stale(self) -> bool:
+        return (
+            self.updated_at is None
+            or time.monotonic() - self.updated_at > self.stale_after
+        )
+
+    def update(self, server: Server) -> bool:
+        self.updated_at = time.monotonic()
+        data = server_to_dict(server)
+        if data == self._data:
+            return False
+        self._data = data
+        self.body = json.dumps(data, separators=(",", ":")).encode("utf-8")
+        self.etag = '"' + hashlib.blake2b(self.body, digest_size=16).hexdigest() + '"'
+        return True
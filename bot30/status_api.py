@@ -0,0 +1,58 @@
+import logging
+from collections.abc import Awaitable, Callable
+
+from aiohttp import web
+
+from .status import StatusSnapshot
+
+logger = logging.getLogger(__name__)
+
+
+def _etag_matches(etag: str, if_none_match: str) -> bool:
+    # If-None-Match uses the weak comparison, see RFC 7232 section 3.2
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or etag in (t.removeprefix("W/") for t in tags)
+
+
+def _status_handler(
+    snapshot: StatusSnapshot,
+) -> Callable[[web.Request], Awaitable[web.StreamResponse]]:
+    async def handle(request: web.Request) -> web.StreamResponse:
+        # no data yet, or the last polls failed
+        if snapshot.body is None or snapshot.etag is None or snapshot.is_stale():
+            return web.Response(
+                status=503, headers={"Retry-After": str(snapshot.max_age)}
+            )
+        headers = {
+            "ETag": snapshot.etag,
+            "Cache-Control": f"public, max-age={snapshot.max_age}",
+            "Access-Control-Allow-Origin": "*",
+        }
+        if _etag_matches(snapshot.etag, request.headers.get("If-None-Match", "")):
+            return web.Response(status=304, headers=headers)
+        return web.Response(
+            body=snapshot.body,
+            content_type="application/json",
+            headers=headers,
+        )
+
+    return handle
+
+
+def create_app(snapshot: StatusSnapshot) -> web.Application:
+    app = web.Application()
+    app.router.add_get("/status", _status_handler(snapshot))
+    return app
+
+
+async def start_status_api(
+    snapshot: StatusSnapshot,
+    host: str,
+    port: int,
+) -> web.AppRunner:
+    runner = web.AppRunner(create_app(snapshot), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    logger.info("Status API listening on http://%s:%s/status", host, port)
+    return runner
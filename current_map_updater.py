@@ -1,38 +1,88 @@
+from __future__ import annotations
+
 import asyncio
+import functools
 import logging
 import time
-
-import discord
+from typing import TYPE_CHECKING
 
 from bot30 import __version__, settings
-from bot30.clients import Bot30Client, RCONClient
+from bot30.leaderboard import Leaderboard, load_leaderboard, save_leaderboard
 from bot30.models import Player, Server
+from bot30.profiling import profile_run, span
+from bot30.rcon import RCONClient, RCONConnectionPool
+from bot30.sessions import PlayerSession, SessionTracker
+from bot30.state import load_state, save_state
+from bot30.status import StatusSnapshot
+
+if TYPE_CHECKING:
+    # discord.py is slow to import, it is only loaded once we know that the
+    # message needs to be updated
+    import discord
+    from discord.types.embed import Embed as EmbedData
+
+    from bot30.clients import Bot30Client
 
 logger = logging.getLogger("bot30.current_map")
 
 START_TICK = time.monotonic()
 
+# RCON connections are kept open and reused between polls
+RCON_POOL = RCONConnectionPool(
+    max_connections=settings.RCON_MAX_CONNECTIONS,
+    capture_dir=settings.RCON_CAPTURE_DIR,
+)
+
+# Player sessions, updated on every successful poll
+SESSIONS = SessionTracker(settings.CURRENT_MAP_SESSION_SAMPLES)
+
+# Latest server served by the status API when hosted by the scheduler, idle
+# servers are only polled once per scheduler run
+STATUS = StatusSnapshot(
+    max_age=max(int(settings.CURRENT_MAP_UPDATE_DELAY), 1),
+    stale_after=3 * settings.SCHEDULER_CURRENT_MAP_INTERVAL,
+)
+
 # Max embed field length is roughly 48. We use 18 to display the
 # ` [K../D./A.] 123ms` scores, and we want to leave a few chars
 # for it to fit comfortably
 EMBED_NO_PLAYERS = "```\n" + " " * (24 + 18) + "\n```"
 
 
-def format_player(p: Player) -> str:
-    ping = f"{p.ping:3}ms" if p.ping > 0 else ""
+def format_player(p: Player, session: PlayerSession | None = None) -> str:
+    ping_ms = p.ping
+    lagging = False
+    if session is not None and (avg_ping := session.avg_ping) is not None:
+        # smooth out the ping and flag players that lag on a regular basis
+        ping_ms = round(avg_ping)
+        lagging = (session.p95_ping or 0) >= settings.CURRENT_MAP_LAG_PING
+    ping = f"{ping_ms:3}ms" if ping_ms > 0 else ""
+    if lagging:
+        ping += "!"
     return f"{p.name[:24]:24} [{p.kills:3}/{p.deaths:2}/{p.assists:2}] {ping}"
 
 
-def player_score_display(players: list[Player]) -> str | None:
+def player_score_display(
+    players: list[Player],
+    sessions: SessionTracker | None = None,
+) -> str | None:
     if not players:
         return None
 
-    return "```\n" + "\n".join([format_player(p) for p in players]) + "\n```"
+    if sessions is None:
+        lines = [format_player(p) for p in players]
+    else:
+        lines = [format_player(p, sessions.get(p)) for p in players]
+    return "```\n" + "\n".join(lines) + "\n```"
 
 
-def add_player_fields(embed: discord.Embed, server: Server) -> None:
-    team_r = player_score_display(server.team_red)
-    team_b = player_score_display(server.team_blue)
+def add_player_fields(
+    embed: discord.Embed,
+    server: Server,
+    sessions: SessionTracker | None = None,
+) -> None:
+    team_r = player_score_display(server.team_red, sessions)
+    team_b = player_score_display(server.team_blue, sessions)
     if team_r or team_b:
         embed.add_field(
             name=f"Red ({server.score_red})",
@@ -44,7 +94,7 @@ def add_player_fields(embed: discord.Embed, server: Server) -> None:
             value=team_b or EMBED_NO_PLAYERS,
             inline=False,
         )
-    elif team_free := player_score_display(server.team_free):
+    elif team_free := player_score_display(server.team_free, sessions):
         embed.add_field(name="Players", value=team_free, inline=False)
 
     if server.spectators:
@@ -66,7 +116,12 @@ def add_mapinfo_field(embed: discord.Embed, server: Server) -> None:
     embed.add_field(name="Game Time / Player Counts", value=info, inline=False)
 
 
-def create_server_embed(server: Server | None) -> discord.Embed:
+def create_server_embed(
+    server: Server | None,
+    sessions: SessionTracker | None = None,
+) -> discord.Embed:
+    import discord
+
     embed = discord.Embed(title=settings.CURRENT_MAP_EMBED_TITLE)
 
     last_updated = f"updated <t:{int(time.time())}:R>"
@@ -81,7 +136,7 @@ def create_server_embed(server: Server | None) -> discord.Embed:
         if server.players:
             embed.colour = discord.Colour.green()
             add_mapinfo_field(embed, server)
-            add_player_fields(embed, server)
+            add_player_fields(embed, server, sessions)
             embed.add_field(name=connect_info, value=last_updated, inline=False)
         else:
             embed.colour = discord.Colour.light_grey()
@@ -97,23 +152,100 @@ def create_server_embed(server: Server | None) -> discord.Embed:
     return embed
 
 
+@functools.cache
+def get_leaderboard() -> Leaderboard | None:
+    if not settings.LEADERBOARD_EMBED_TITLE:
+        return None
+    return load_leaderboard(
+        settings.LEADERBOARD_FILE,
+        settings.LEADERBOARD_WINDOW,
+        settings.LEADERBOARD_BUCKET,
+        SESSIONS,
+    )
+
+
+def save_leaderboard_and_sessions() -> None:
+    """
+    Saves the leaderboard along with the last seen player scores, these are
+    saved on every run so the next one counts the scores made in between.
+    """
+    if (leaderboard := get_leaderboard()) is not None:
+        save_leaderboard(settings.LEADERBOARD_FILE, leaderboard, SESSIONS)
+
+
+def check_partial(server: Server) -> Server | None:
+    """
+    Logs the problems found parsing a partial reply, returns None if there are
+    too many of them for the server to be published.
+    """
+    logger.warning(
+        "Partial server info, %s parse errors: %s",
+        len(server.diagnostics),
+        server.diagnostics,
+    )
+    if len(server.diagnostics) > settings.CURRENT_MAP_MAX_PARSE_ERRORS:
+        return None
+    return server
+
+
+def render_replies(replies: list[bytes]) -> list[EmbedData]:
+    """
+    Parses and renders a batch of raw `players` replies, meant to be run in a
+    worker process to keep the regex and string work off the event loop. Only
+    the embeds as `discord.Embed.to_dict()` are sent back, session ping
+    smoothing is not available to the workers.
+    """
+    rendered = []
+    for reply in replies:
+        server: Server | None
+        try:
+            server = Server.from_lines(
+                RCONClient.iter_lines([memoryview(reply)]),
+                tolerant=settings.CURRENT_MAP_MAX_PARSE_ERRORS > 0,
+            )
+        except Exception:
+            logger.exception("Failed to parse server info")
+            server = None
+        if server is not None and server.partial:
+            server = check_partial(server)
+        rendered.append(create_server_embed(server).to_dict())
+    return rendered
+
+
 async def server_info() -> Server | None:
     if not (rcon_pass := settings.GAME_SERVER_RCON_PASS):
         raise RuntimeError("GAME_SERVER_RCON_PASS")
-    async with RCONClient(
+    async with RCON_POOL.client(
         host=settings.GAME_SERVER_IP,
         port=settings.GAME_SERVER_PORT,
         rcon_pass=rcon_pass,
     ) as c:
         try:
-            return await c.server_info()
+            server = await c.server_info(
+                tolerant=settings.CURRENT_MAP_MAX_PARSE_ERRORS > 0
+            )
         except Exception:
             logger.exception("Failed to get server info")
             return None
+    if server.partial:
+        # players missing from the reply would end their sessions, only
+        # complete replies are tracked and served by the status API
+        return check_partial(server)
+    now = time.time()
+    # loaded first, it restores the scores saved by the previous run
+    leaderboard = get_leaderboard()
+    SESSIONS.update(server, now)
+    if leaderboard is not None:
+        leaderboard.add_sessions(SESSIONS, now)
+    STATUS.update(server)
+    return server
 
 
 def should_update_embed(message: discord.Message, embed: discord.Embed) -> bool:
-    current_embed = message.embeds[0]
+    return embed_changed(message.embeds[0], embed)
+
+
+def embed_changed(current_embed: discord.Embed, embed: discord.Embed) -> bool:
     # embed fields indicate that either players are connected or there was an
     # error getting server info, in either case we want to continue updating
     if current_embed.fields or embed.fields:
@@ -146,69 +278,122 @@ def same_map_and_specs(s1: Server | None, s2: Server | None) -> bool:
 async def update_message_embed_periodically(
     message: discord.Message,
     server: Server | None,
-) -> None:
+    stop_at: float | None = None,
+) -> tuple[Server | None, discord.Message]:
+    """
+    Keeps editing the message while the server changes, returns the last
+    polled server and the last edited message.
+    """
     delay = settings.CURRENT_MAP_UPDATE_DELAY
-    stop_at = START_TICK + (settings.BOT_MAX_RUN_TIME - delay - 1.5)
+    if stop_at is None:
+        stop_at = START_TICK + (settings.BOT_MAX_RUN_TIME - delay - 1.5)
     while time.monotonic() < stop_at:
         await asyncio.sleep(delay)
         prev_server = server
         server = await server_info()
         if same_map_and_specs(prev_server, server):
             break
-        embed = create_server_embed(server)
+        embed = create_server_embed(server, SESSIONS)
         logger.debug("Updating message: %s", message.id)
-        await message.edit(embed=embed)
+        with span("edit"):
+            message = await message.edit(embed=embed)
         if not embed.fields:
             break
+    return server, message
 
 
-async def update_current_map(client: Bot30Client) -> None:
+async def update_current_map(client: Bot30Client, server: Server | None) -> None:
     await client.login(settings.BOT_TOKEN)
-    channel_name = settings.CHANNEL_NAME_MAPCYCLE
-    embed_title = settings.CURRENT_MAP_EMBED_TITLE
-    channel_message, server = await asyncio.gather(
-        client.fetch_embed_message(channel_name, embed_title),
-        server_info(),
+    channel, message = await client.fetch_embed_message(
+        settings.CHANNEL_NAME_MAPCYCLE, settings.CURRENT_MAP_EMBED_TITLE
     )
-    channel, message = channel_message
-    embed = create_server_embed(server)
+    await publish_current_map(channel, message, server)
+
+
+async def publish_current_map(
+    channel: discord.TextChannel,
+    message: discord.Message | None,
+    server: Server | None,
+    stop_at: float | None = None,
+) -> discord.Message:
+    """
+    Publishes the server embed, then keeps updating it while players are
+    online until `stop_at`. Returns the message holding the embed.
+    """
+    embed = create_server_embed(server, SESSIONS)
     if message:
         if should_update_embed(message, embed):
             logger.info("Updating existing message: %s", message.id)
-            await message.edit(embed=embed)
-            await update_message_embed_periodically(message, server)
+            with span("edit"):
+                message = await message.edit(embed=embed)
+            server, message = await update_message_embed_periodically(
+                message, server, stop_at
+            )
         else:
             logger.info("Existing message embed is up to date")
     else:
         logger.info("Sending new message")
-        await channel.send(embed=embed)
+        with span("send"):
+            message = await channel.send(embed=embed)
         # in case players are connected when we create the message, keep
         # updating it if needed
-        _, message = await client.fetch_embed_message(
-            settings.CHANNEL_NAME_MAPCYCLE, settings.CURRENT_MAP_EMBED_TITLE
+        server, message = await update_message_embed_periodically(
+            message, server, stop_at
         )
-        if message:
-            await update_message_embed_periodically(message, server)
+
+    if state_file := settings.CURRENT_MAP_STATE_FILE:
+        save_state(state_file, server)
+    save_leaderboard_and_sessions()
+    return message
+
+
+def is_published(server: Server | None) -> bool:
+    """
+    Checks the locally recorded state to determine if the Discord message
+    already reflects the server, in which case there is nothing to do.
+    """
+    if not (state_file := settings.CURRENT_MAP_STATE_FILE):
+        return False
+    state = load_state(state_file)
+    return state is not None and state.is_current(
+        server, settings.CURRENT_MAP_STATE_MAX_AGE
+    )
 
 
 async def async_main() -> None:
-    logger.info("Current Map Updater v%s Start", __version__)
-
-    client = Bot30Client(settings.BOT_USER, settings.BOT_SERVER_NAME)
-    logger.info("%s", client)
-    try:
-        await asyncio.wait_for(
-            update_current_map(client),
-            timeout=settings.BOT_MAX_RUN_TIME,
-        )
-    except Exception:
-        logger.exception("Failed to update current map")
-        raise
-    finally:
-        await asyncio.wait_for(client.close(), timeout=5)
-
-    await asyncio.sleep(0.5)
-    logger.info("Current Map Updater End")
+    async with profile_run(
+        "current_map_updater",
+        settings.BOT_PROFILE_DIR,
+        settings.BOT_PROFILE_SLOW_CALLBACK,
+    ):
+        logger.info("Current Map Updater v%s Start", __version__)
+
+        server = await server_info()
+        if is_published(server):
+            save_leaderboard_and_sessions()
+            await RCON_POOL.close()
+            logger.info("Server state unchanged since last published: %s", server)
+            logger.info("Current Map Updater End")
+            return
+
+        from bot30.clients import Bot30Client
+
+        client = Bot30Client(settings.BOT_USER, settings.BOT_SERVER_NAME)
+        logger.info("%s", client)
+        try:
+            await asyncio.wait_for(
+                update_current_map(client, server),
+                timeout=settings.BOT_MAX_RUN_TIME,
+            )
+        except Exception:
+            logger.exception("Failed to update current map")
+            raise
+        finally:
+            await asyncio.wait_for(client.close(), timeout=5)
+            await RCON_POOL.close()
+
+        await asyncio.sleep(0.5)
+        logger.info("Current Map Updater End")
 
 
 if __name__ == "__main__":
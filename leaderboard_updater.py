@@ -0,0 +1,96 @@
+import asyncio
+import logging
+import time
+
+import discord
+
+from bot30 import __version__, settings
+from bot30.clients import Bot30Client
+from bot30.embeds import publish_embed
+from bot30.leaderboard import Leaderboard, LeaderboardEntry, load_leaderboard
+from bot30.profiling import profile_run
+
+logger = logging.getLogger("bot30.leaderboard")
+
+
+def format_entry(rank: int, entry: LeaderboardEntry) -> str:
+    return (
+        f"{rank:2}. {entry.name[:20]:20} "
+        f"[{entry.kills:4}/{entry.deaths:4}/{entry.assists:3}]"
+    )
+
+
+def create_leaderboard_embed(
+    title: str,
+    entries: list[LeaderboardEntry],
+    window: float,
+) -> discord.Embed:
+    if entries:
+        descr = (
+            "```\n"
+            + "\n".join([format_entry(i, e) for i, e in enumerate(entries, 1)])
+            + "\n```"
+        )
+    else:
+        descr = "*No scores recorded yet*"
+    embed = discord.Embed(
+        title=title,
+        description=descr,
+        colour=discord.Colour.gold(),
+    )
+    days = window / 86400
+    period = f"{days:g} days" if days >= 1 else f"{window / 3600:g} hours"
+    embed.add_field(
+        name=f"Top players over the last {period} [K/D/A]",
+        value=f"updated <t:{int(time.time())}:R>",
+        inline=False,
+    )
+    return embed
+
+
+def create_embed(leaderboard: Leaderboard, title: str) -> discord.Embed:
+    entries = leaderboard.top(settings.LEADERBOARD_SIZE, time.time())
+    return create_leaderboard_embed(title, entries, leaderboard.window)
+
+
+async def update_leaderboard(client: Bot30Client, title: str) -> None:
+    leaderboard = load_leaderboard(
+        settings.LEADERBOARD_FILE,
+        settings.LEADERBOARD_WINDOW,
+        settings.LEADERBOARD_BUCKET,
+    )
+    embed = create_embed(leaderboard, title)
+    await client.login(settings.BOT_TOKEN)
+    channel, message = await client.fetch_embed_message(
+        settings.CHANNEL_NAME_MAPCYCLE, title
+    )
+    await publish_embed(channel, message, embed)
+
+
+async def async_main() -> None:
+    if not (title := settings.LEADERBOARD_EMBED_TITLE):
+        raise RuntimeError("LEADERBOARD_EMBED_TITLE")
+
+    async with profile_run(
+        "leaderboard_updater",
+        settings.BOT_PROFILE_DIR,
+        settings.BOT_PROFILE_SLOW_CALLBACK,
+    ):
+        logger.info("Leaderboard Updater v%s Start", __version__)
+
+        client = Bot30Client(settings.BOT_USER, settings.BOT_SERVER_NAME)
+        logger.info("%s", client)
+        try:
+            await asyncio.wait_for(update_leaderboard(client, title), timeout=30)
+        except Exception:
+            logger.exception("Failed to update leaderboard")
+            raise
+        finally:
+            await asyncio.wait_for(client.close(), timeout=10)
+
+        await asyncio.sleep(0.5)
+        logger.info("Leaderboard Updater End")
+
+
+if __name__ == "__main__":
+    asyncio.run(async_main())
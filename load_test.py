@@ -0,0 +1,564 @@
+"""
+Load tests the current map pipeline against local stand-ins.
+
+    python load_test.py --servers 1 10 50 --players 64 --duration 60
+
+A child process runs N fake UDP game servers, each with synthetic players
+whose scores change over time, along with a local stand-in for the Discord
+REST endpoints used by `Bot30Client` that answers a share of the requests
+with a 429. This process then polls, renders and publishes every server the
+same way the current map updater does and reports the poll latency, CPU and
+RSS per server and the number of edits per minute as N scales.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import dataclasses
+import importlib
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import random
+import resource
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.connection import Connection
+from multiprocessing.sharedctypes import Synchronized
+from typing import TYPE_CHECKING, Any, cast
+
+import discord
+from aiohttp import web
+
+from bot30 import settings
+from bot30.batching import BatchExecutor
+from bot30.clients import Bot30Client
+from bot30.rcon import RCONClient, RCONConnectionPool
+from current_map_updater import render_replies, should_update_embed
+
+if TYPE_CHECKING:
+    from discord.types.embed import Embed as EmbedData
+
+logger = logging.getLogger("bot30.load_test")
+
+HOST = "127.0.0.1"
+BOT_USER = "LoadTest#0001"
+GUILD_NAME = "Load Test"
+RCON_PASS = "loadtest"  # noqa: S105
+# payload size the game server flushes its redirected output at
+MAX_DATAGRAM_PAYLOAD = 1000
+
+
+@dataclasses.dataclass
+class FakePlayer:
+    slot: int
+    name: str
+    team: str
+    ping: int
+    kills: int = 0
+    deaths: int = 0
+    assists: int = 0
+
+
+class FakeGameServer(asyncio.DatagramProtocol):
+    """Answers the RCON `players` command with synthetic players."""
+
+    def __init__(self, player_count: int, seed: int) -> None:
+        self.rng = random.Random(seed)
+        self.transport: asyncio.DatagramTransport | None = None
+        self.started = time.monotonic()
+        self.players = [
+            FakePlayer(
+                slot=slot,
+                name=f"player{slot:02}",
+                team="RED" if slot % 2 else "BLUE",
+                ping=self.rng.randint(20, 150),
+            )
+            for slot in range(player_count)
+        ]
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self.transport = cast(asyncio.DatagramTransport, transport)
+
+    def _advance(self) -> None:
+        for p in self.players:
+            p.kills += self.rng.choice((0, 0, 0, 1))
+            p.deaths += self.rng.choice((0, 0, 0, 1))
+            p.assists += self.rng.choice((0, 0, 0, 0, 1))
+            p.ping = max(5, p.ping + self.rng.randint(-10, 10))
+
+    def reply_lines(self) -> list[bytes]:
+        elapsed = int(time.monotonic() - self.started)
+        mins, secs = divmod(elapsed, 60)
+        header = [
+            b"Map: ut4_abbey",
+            f"Players: {len(self.players)}".encode(),
+            b"GameType: CTF",
+            b"Scores: R:3 B:2",
+            b"MatchMode: OFF",
+            b"WarmupPhase: NO",
+            f"GameTime: 00:{mins:02}:{secs:02}".encode(),
+        ]
+        players = [
+            (
+                f"{p.slot}:{p.name}^7 TEAM:{p.team} KILLS:{p.kills} "
+                f"DEATHS:{p.deaths} ASSISTS:{p.assists} PING:{p.ping} "
+                f"AUTH:{p.name} IP:127.0.0.1:{27960 + p.slot}"
+            ).encode()
+            for p in self.players
+        ]
+        return header + players
+
+    def datagram_received(self, data: bytes, addr: tuple[str, int]) -> None:
+        if self.transport is None or not data.endswith(b" players\n"):
+            return
+        self._advance()
+        chunk: list[bytes] = []
+        size = 0
+        for line in self.reply_lines():
+            if chunk and size + len(line) + 1 > MAX_DATAGRAM_PAYLOAD:
+                self.transport.sendto(
+                    RCONClient.REPLY_PREFIX + b"\n".join(chunk) + b"\n", addr
+                )
+                chunk, size = [], 0
+            chunk.append(line)
+            size += len(line) + 1
+        if chunk:
+            self.transport.sendto(
+                RCONClient.REPLY_PREFIX + b"\n".join(chunk) + b"\n", addr
+            )
+
+
+def _json_response(
+    data: Any,
+    status: int = 200,
+    headers: dict[str, str] | None = None,
+) -> web.Response:
+    # discord.py only decodes bodies with this exact content type, without charset
+    return web.Response(
+        body=json.dumps(data).encode(),
+        status=status,
+        headers=headers,
+        content_type="application/json",
+    )
+
+
+class FakeDiscord:
+    """
+    Stand-in for the Discord REST endpoints used by `Bot30Client`, every
+    `rate_limit_every` request is answered with a 429.
+    """
+
+    def __init__(
+        self,
+        channel_count: int,
+        rate_limit_every: int,
+        requests: Synchronized[int],
+        rate_limited: Synchronized[int],
+    ) -> None:
+        self.channel_count = channel_count
+        self.rate_limit_every = rate_limit_every
+        self.requests = requests
+        self.rate_limited = rate_limited
+        self.ids = itertools.count(1000)
+        self.user = {
+            "id": "1",
+            "username": BOT_USER.split("#")[0],
+            "discriminator": BOT_USER.split("#")[1],
+            "avatar": None,
+            "bot": True,
+        }
+        self.messages: dict[str, dict[str, dict[str, Any]]] = {
+            self.channel_id(i): {} for i in range(channel_count)
+        }
+
+    @staticmethod
+    def channel_id(index: int) -> str:
+        return str(100 + index)
+
+    @web.middleware
+    async def rate_limiter(
+        self,
+        request: web.Request,
+        handler: Any,
+    ) -> web.StreamResponse:
+        with self.requests.get_lock():
+            self.requests.value += 1
+            count = self.requests.value
+        if self.rate_limit_every and count % self.rate_limit_every == 0:
+            with self.rate_limited.get_lock():
+                self.rate_limited.value += 1
+            return _json_response(
+                {"message": "You are being rate limited.", "retry_after": 0.05},
+                status=429,
+                headers={"Via": "1.1 load-test"},
+            )
+        response: web.StreamResponse = await handler(request)
+        return response
+
+    def _message(self, channel_id: str, data: dict[str, Any]) -> dict[str, Any]:
+        return {
+            "id": str(next(self.ids)),
+            "channel_id": channel_id,
+            "author": self.user,
+            "content": "",
+            "timestamp": "2023-04-01T00:00:00+00:00",
+            "edited_timestamp": None,
+            "tts": False,
+            "mention_everyone": False,
+            "mentions": [],
+            "mention_roles": [],
+            "attachments": [],
+            "embeds": data.get("embeds", []),
+            "pinned": False,
+            "type": 0,
+        }
+
+    async def me(self, _: web.Request) -> web.Response:
+        return _json_response(self.user)
+
+    async def application(self, _: web.Request) -> web.Response:
+        return _json_response(
+            {
+                "id": "1",
+                "name": "load-test",
+                "description": "",
+                "icon": None,
+                "rpc_origins": [],
+                "bot_public": True,
+                "bot_require_code_grant": False,
+                "owner": self.user,
+                "verify_key": "",
+            }
+        )
+
+    async def guilds(self, _: web.Request) -> web.Response:
+        guild: dict[str, Any] = {
+            "id": "10",
+            "name": GUILD_NAME,
+            "icon": None,
+            "features": [],
+        }
+        return _json_response([guild])
+
+    async def channels(self, _: web.Request) -> web.Response:
+        return _json_response(
+            [
+                {
+                    "id": self.channel_id(i),
+                    "type": 0,
+                    "guild_id": "10",
+                    "name": f"load-test-{i}",
+                    "position": i,
+                    "permission_overwrites": [],
+                    "nsfw": False,
+                    "parent_id": None,
+                }
+                for i in range(self.channel_count)
+            ]
+        )
+
+    async def history(self, request: web.Request) -> web.Response:
+        messages = self.messages[request.match_info["channel_id"]]
+        return _json_response(list(reversed(messages.values())))
+
+    async def send(self, request: web.Request) -> web.Response:
+        channel_id = request.match_info["channel_id"]
+        msg = self._message(channel_id, await request.json())
+        self.messages[channel_id][msg["id"]] = msg
+        return _json_response(msg)
+
+    async def edit(self, request: web.Request) -> web.Response:
+        channel_id = request.match_info["channel_id"]
+        msg = self.messages[channel_id][request.match_info["message_id"]]
+        msg["embeds"] = (await request.json()).get("embeds", msg["embeds"])
+        return _json_response(msg)
+
+    def create_app(self) -> web.Application:
+        app = web.Application(middlewares=[self.rate_limiter])
+        api = "/api/v10"
+        app.router.add_get(f"{api}/users/@me", self.me)
+        app.router.add_get(f"{api}/oauth2/applications/@me", self.application)
+        app.router.add_get(f"{api}/users/@me/guilds", self.guilds)
+        app.router.add_get(f"{api}/guilds/{{guild_id}}/channels", self.channels)
+        messages = f"{api}/channels/{{channel_id}}/messages"
+        app.router.add_get(messages, self.history)
+        app.router.add_post(messages, self.send)
+        app.router.add_patch(f"{messages}/{{message_id}}", self.edit)
+        return app
+
+
+async def _run_standins(  # noqa: PLR0913
+    servers: int,
+    players: int,
+    rate_limit_every: int,
+    conn: Connection,
+    requests: Synchronized[int],
+    rate_limited: Synchronized[int],
+) -> None:
+    loop = asyncio.get_running_loop()
+    ports = []
+    for i in range(servers):
+        transport, _ = await loop.create_datagram_endpoint(
+            lambda i=i: FakeGameServer(players, seed=i),  # type: ignore[misc]
+            local_addr=(HOST, 0),
+        )
+        ports.append(transport.get_extra_info("sockname")[1])
+
+    fake_discord = FakeDiscord(servers, rate_limit_every, requests, rate_limited)
+    runner = web.AppRunner(fake_discord.create_app(), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, HOST, 0)
+    await site.start()
+    discord_port = runner.addresses[0][1]
+    conn.send((discord_port, ports))
+    await asyncio.Event().wait()
+
+
+def run_standins(  # noqa: PLR0913
+    servers: int,
+    players: int,
+    rate_limit_every: int,
+    conn: Connection,
+    requests: Synchronized[int],
+    rate_limited: Synchronized[int],
+) -> None:
+    asyncio.run(
+        _run_standins(servers, players, rate_limit_every, conn, requests, rate_limited)
+    )
+
+
+@dataclasses.dataclass
+class LoadStats:
+    poll_latencies: list[float] = dataclasses.field(default_factory=list)
+    render_latencies: list[float] = dataclasses.field(default_factory=list)
+    loop_lags: list[float] = dataclasses.field(default_factory=list)
+    cycle_latencies: list[float] = dataclasses.field(default_factory=list)
+    errors: int = 0
+    edits: int = 0
+
+
+def _percentiles(values: list[float]) -> str:
+    if len(values) < 2:  # noqa: PLR2004
+        return "n/a"
+    q = statistics.quantiles(values, n=100)
+    return f"{q[49] * 1000:.1f}/{q[94] * 1000:.1f}/{q[98] * 1000:.1f}ms"
+
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:  # noqa: PTH123
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # peak rather than current RSS, in KiB on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _cpu_time() -> float:
+    # includes render workers once they have exited
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return time.process_time() + children.ru_utime + children.ru_stime
+
+
+def _init_render_worker() -> None:
+    # discord.py is imported on first use when rendering, which is slow
+    importlib.import_module("discord")
+
+
+async def monitor_loop_lag(stats: LoadStats, stop_at: float) -> None:
+    """Records how late the event loop wakes up a sleeping task."""
+    interval = 0.05
+    while time.monotonic() < stop_at:
+        started = time.monotonic()
+        await asyncio.sleep(interval)
+        stats.loop_lags.append(max(time.monotonic() - started - interval, 0))
+
+
+async def poll_server(  # noqa: PLR0913
+    client: Bot30Client,
+    pool: RCONConnectionPool,
+    renderer: BatchExecutor[bytes, EmbedData] | None,
+    index: int,
+    port: int,
+    args: argparse.Namespace,
+    stats: LoadStats,
+    stop_at: float,
+) -> None:
+    channel, message = await client.fetch_embed_message(
+        f"load-test-{index}", settings.CURRENT_MAP_EMBED_TITLE
+    )
+    while (started := time.monotonic()) < stop_at:
+        try:
+            async with pool.client(HOST, port, RCON_PASS) as c:
+                fragments = await c.players(timeout=args.rcon_timeout, retries=1)
+            polled = time.monotonic()
+            stats.poll_latencies.append(polled - started)
+            # both paths render the same way so that only the handoff to the
+            # workers differs
+            reply = b"".join(fragments)
+            if renderer is None:
+                [rendered] = render_replies([reply])
+            else:
+                rendered = await renderer.submit(reply)
+            embed = discord.Embed.from_dict(rendered)
+            stats.render_latencies.append(time.monotonic() - polled)
+            if message is None:
+                message = await channel.send(embed=embed)
+                stats.edits += 1
+            elif should_update_embed(message, embed):
+                message = await message.edit(embed=embed)
+                stats.edits += 1
+            stats.cycle_latencies.append(time.monotonic() - started)
+        except Exception:
+            logger.exception("Server %s poll failed", index)
+            stats.errors += 1
+        await asyncio.sleep(max(args.interval - (time.monotonic() - started), 0))
+
+
+async def run_pipeline(
+    servers: int,
+    discord_port: int,
+    ports: list[int],
+    args: argparse.Namespace,
+) -> LoadStats:
+    discord.http.Route.BASE = f"http://{HOST}:{discord_port}/api/v10"
+    client = Bot30Client(BOT_USER, GUILD_NAME)
+    pool = RCONConnectionPool()
+    stats = LoadStats()
+    executor = None
+    renderer = None
+    if args.render_workers:
+        executor = ProcessPoolExecutor(
+            args.render_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_render_worker,
+        )
+        renderer = BatchExecutor(render_replies, executor, args.render_batch)
+        # start the workers up front, spawning them is not part of the test
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(
+            *(
+                loop.run_in_executor(executor, render_replies, [])
+                for _ in range(args.render_workers)
+            )
+        )
+    try:
+        await client.login("load-test")
+        stop_at = time.monotonic() + args.duration
+        await asyncio.gather(
+            monitor_loop_lag(stats, stop_at),
+            *(
+                poll_server(client, pool, renderer, i, port, args, stats, stop_at)
+                for i, port in enumerate(ports[:servers])
+            ),
+        )
+    finally:
+        if renderer is not None:
+            await renderer.close()
+        if executor is not None:
+            executor.shutdown()
+        await pool.close()
+        await client.close()
+    return stats
+
+
+def run_load_test(servers: int, args: argparse.Namespace) -> None:
+    ctx = multiprocessing.get_context("spawn")
+    parent_conn, child_conn = ctx.Pipe()
+    requests = cast("Synchronized[int]", ctx.Value("i", 0))
+    rate_limited = cast("Synchronized[int]", ctx.Value("i", 0))
+    standins = ctx.Process(
+        target=run_standins,
+        args=(
+            servers,
+            args.players,
+            args.rate_limit_every,
+            child_conn,
+            requests,
+            rate_limited,
+        ),
+        daemon=True,
+    )
+    standins.start()
+    try:
+        discord_port, ports = parent_conn.recv()
+        rss_before = _rss_bytes()
+        cpu_before = _cpu_time()
+        wall_before = time.monotonic()
+        stats = asyncio.run(run_pipeline(servers, discord_port, ports, args))
+        wall = time.monotonic() - wall_before
+        cpu = _cpu_time() - cpu_before
+        rss_per_server = (_rss_bytes() - rss_before) / servers
+    finally:
+        standins.terminate()
+        standins.join()
+
+    logger.info(
+        "servers=%s polls=%s errors=%s p50/p95/p99 poll=%s render=%s cycle=%s "
+        "loop lag=%s",
+        servers,
+        len(stats.poll_latencies),
+        stats.errors,
+        _percentiles(stats.poll_latencies),
+        _percentiles(stats.render_latencies),
+        _percentiles(stats.cycle_latencies),
+        _percentiles(stats.loop_lags),
+    )
+    logger.info(
+        "servers=%s cpu/server=%.2f%% rss/server=%.1fKiB edits/min=%.1f "
+        "(%.1f per server) discord requests=%s 429s=%s",
+        servers,
+        cpu / wall / servers * 100,
+        rss_per_server / 1024,
+        stats.edits / wall * 60,
+        stats.edits / wall * 60 / servers,
+        requests.value,
+        rate_limited.value,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--servers", type=int, nargs="+", default=[1, 5, 10])
+    parser.add_argument("--players", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=settings.CURRENT_MAP_UPDATE_DELAY,
+        help="seconds between polls of each server",
+    )
+    parser.add_argument("--rcon-timeout", type=float, default=0.75)
+    parser.add_argument(
+        "--rate-limit-every",
+        type=int,
+        default=50,
+        help="answer every Nth Discord request with a 429, 0 to disable",
+    )
+    parser.add_argument(
+        "--render-workers",
+        type=int,
+        default=0,
+        help="parse and render in a pool of this many processes, 0 to disable",
+    )
+    parser.add_argument(
+        "--render-batch",
+        type=int,
+        default=16,
+        help="max replies sent to a render worker at once",
+    )
+    args = parser.parse_args()
+    logging.getLogger("bot30").setLevel(logging.INFO)
+
+    for servers in args.servers:
+        run_load_test(servers, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,23 @@
 import asyncio
+import functools
 import logging
 import time
+from pathlib import Path
 
 import aiofiles
 import discord
 
 from bot30 import __version__, settings
 from bot30.clients import Bot30Client
+from bot30.embeds import publish_embed
+from bot30.maps import MapCatalog, load_catalog_cached
 from bot30.models import GameType
+from bot30.profiling import profile_run
 
 logger = logging.getLogger("bot30.mapcycle")
 
 MapCycle = dict[str, dict[str, str]]
+MapOptions = frozenset[tuple[str, str]]
 
 
 def map_mode(map_opts: dict[str, str]) -> str:
@@ -28,41 +34,115 @@ def map_mode(map_opts: dict[str, str]) -> str:
     return "" if result == GameType.CTF.name else f"({result})"
 
 
+@functools.cache
+def _map_mode_label(opts: MapOptions) -> str:
+    return map_mode(dict(opts))
+
+
 def parse_mapcycle_lines(lines: list[str]) -> MapCycle:
+    """
+    Parses the map cycle, maps with the same options share a single dict
+    of them, these are not to be modified.
+    """
     result: MapCycle = {}
+    interned: dict[MapOptions, dict[str, str]] = {}
     map_name = ""
-    map_config = None
+    map_config: dict[str, str] | None = None
     for raw_line in lines:
         line = raw_line.strip()
         if not line or line.startswith("//"):
             continue
         if line == "{":
-            map_config = result[map_name]
+            map_config = {}
         elif line == "}":
+            if map_config is not None:
+                key = frozenset(map_config.items())
+                result[map_name] = interned.setdefault(key, map_config)
             map_config = None
         elif map_config is None:
             map_name = line
-            result[map_name] = {}
+            result[map_name] = interned.setdefault(frozenset(), {})
         else:
             k, v = line.split(" ", maxsplit=1)
             map_config[k.strip()] = v.strip().strip("\"'")
+    if map_config is not None:
+        # the last block was not closed, its options still apply
+        key = frozenset(map_config.items())
+        result[map_name] = interned.setdefault(key, map_config)
     return result
 
 
+class CompiledMapCycle:
+    """
+    Map cycle with every map line rendered up front, the mode label is
+    worked out once per distinct set of options. Any window or page of the
+    cycle can then be rendered without going over the options again.
+    """
+
+    def __init__(self, cycle: MapCycle) -> None:
+        self.maps = tuple(cycle)
+        self.lines = tuple(
+            f"{name:25} {_map_mode_label(frozenset(opts.items()))}"
+            for name, opts in cycle.items()
+        )
+        self._index = {name: i for i, name in enumerate(self.maps)}
+
+    def __len__(self) -> int:
+        return len(self.maps)
+
+    def description(self) -> str:
+        return "```\n" + "\n".join(self.lines) + "```"
+
+    def window(self, start: int, count: int) -> list[str]:
+        """Lines of `count` maps from `start`, wrapping around the cycle."""
+        if not self.lines:
+            return []
+        count = min(count, len(self.lines))
+        return [self.lines[(start + i) % len(self.lines)] for i in range(count)]
+
+    def page(self, number: int, size: int) -> list[str]:
+        return list(self.lines[number * size : (number + 1) * size])
+
+    def up_next(self, current_map: str, count: int) -> list[str]:
+        """Lines of the maps that follow `current_map`, empty if not listed."""
+        if (index := self._index.get(current_map)) is None:
+            return []
+        return self.window(index + 1, min(count, len(self.lines) - 1))
+
+
 async def parse_mapcycle(mapcycle_file: str) -> MapCycle:
     async with aiofiles.open(mapcycle_file, mode="r", encoding="utf-8") as f:
         lines = await f.readlines()
     return parse_mapcycle_lines(lines)
 
 
-def create_mapcycle_embed(cycle: MapCycle) -> discord.Embed:
+@functools.lru_cache(maxsize=4)
+def _compile_mapcycle(mapcycle_file: str, _mtime_ns: int) -> CompiledMapCycle:
+    # the mtime is part of the key so that a modified file is compiled again
+    text = Path(mapcycle_file).read_text(encoding="utf-8")
+    return CompiledMapCycle(parse_mapcycle_lines(text.splitlines(keepends=True)))
+
+
+async def load_mapcycle(mapcycle_file: str) -> CompiledMapCycle:
+    """
+    Parses and compiles the map cycle file, the result is reused for as long
+    as the file is not modified.
+    """
+    mtime_ns = Path(mapcycle_file).stat().st_mtime_ns
+    return await asyncio.to_thread(_compile_mapcycle, mapcycle_file, mtime_ns)
+
+
+def create_mapcycle_embed(
+    cycle: MapCycle | CompiledMapCycle,
+    catalog: MapCatalog | None = None,
+    current_map: str | None = None,
+) -> discord.Embed:
+    if not isinstance(cycle, CompiledMapCycle):
+        cycle = CompiledMapCycle(cycle)
+    missing = catalog.missing(cycle.maps) if catalog is not None else []
     if cycle:
-        descr = (
-            "```\n"
-            + "\n".join([f"{k:25} {map_mode(v)}" for k, v in cycle.items()])
-            + "```"
-        )
-        color = discord.Colour.blue()
+        descr = cycle.description()
+        color = discord.Colour.orange() if missing else discord.Colour.blue()
     else:
         descr = "*Unable to retrieve map cycle*"
         color = discord.Colour.red()
@@ -76,25 +156,46 @@ def create_mapcycle_embed(cycle: MapCycle) -> discord.Embed:
         value=f"updated <t:{int(time.time())}>",
         inline=False,
     )
+    if current_map and (
+        up_next := cycle.up_next(current_map, settings.MAPCYCLE_UP_NEXT)
+    ):
+        embed.add_field(
+            name=f"Up Next after {current_map}",
+            value="```\n" + "\n".join(up_next) + "\n```",
+            inline=False,
+        )
+    if missing:
+        logger.warning("Maps not found on the server: %s", missing)
+        embed.add_field(
+            name="Missing Maps",
+            value="```\n" + "\n".join(missing) + "\n```",
+            inline=False,
+        )
 
     return embed
 
 
-async def create_embed() -> discord.Embed:
+async def create_embed(current_map: str | None = None) -> discord.Embed:
     logger.info("Creating map cycle embed from: %s", settings.MAPCYCLE_FILE)
+    cycle: MapCycle | CompiledMapCycle
     try:
-        cycle = await parse_mapcycle(settings.MAPCYCLE_FILE)
+        cycle = await load_mapcycle(settings.MAPCYCLE_FILE)
     except Exception:
         logger.exception("Failed to parse map cycle file: %s", settings.MAPCYCLE_FILE)
         cycle = {}
-    return create_mapcycle_embed(cycle)
+    return create_mapcycle_embed(cycle, await map_catalog(), current_map)
 
 
-def should_update_embed(message: discord.Message, embed: discord.Embed) -> bool:
-    curr_embed = message.embeds[0]
-    curr_txt = curr_embed.description if curr_embed.description else ""
-    new_txt = embed.description if embed.description else ""
-    return curr_txt.strip() != new_txt.strip()
+async def map_catalog() -> MapCatalog | None:
+    if not (maps_dir := settings.MAPS_DIR):
+        return None
+    try:
+        return await asyncio.to_thread(
+            load_catalog_cached, maps_dir, settings.MAPS_CATALOG_CACHE or None
+        )
+    except Exception:
+        logger.exception("Failed to load map catalog: %s", maps_dir)
+        return None
 
 
 async def update_mapcycle(client: Bot30Client) -> None:
@@ -106,32 +207,29 @@ async def update_mapcycle(client: Bot30Client) -> None:
         create_embed(),
     )
     channel, message = channel_message
-    if message:
-        if should_update_embed(message, embed):
-            logger.info("Updating existing message: %s", message.id)
-            await message.edit(embed=embed)
-        else:
-            logger.info("Existing message embed is up to date")
-    else:
-        logger.info("Sending new message")
-        await channel.send(embed=embed)
+    await publish_embed(channel, message, embed)
 
 
 async def async_main() -> None:
-    logger.info("Map Cycle Updater v%s Start", __version__)
-
-    client = Bot30Client(settings.BOT_USER, settings.BOT_SERVER_NAME)
-    logger.info("%s", client)
-    try:
-        await asyncio.wait_for(update_mapcycle(client), timeout=30)
-    except Exception:
-        logger.exception("Failed to update map cycle")
-        raise
-    finally:
-        await asyncio.wait_for(client.close(), timeout=10)
-
-    await asyncio.sleep(0.5)
-    logger.info("Map Cycle Updater End")
+    async with profile_run(
+        "mapcycle_updater",
+        settings.BOT_PROFILE_DIR,
+        settings.BOT_PROFILE_SLOW_CALLBACK,
+    ):
+        logger.info("Map Cycle Updater v%s Start", __version__)
+
+        client = Bot30Client(settings.BOT_USER, settings.BOT_SERVER_NAME)
+        logger.info("%s", client)
+        try:
+            await asyncio.wait_for(update_mapcycle(client), timeout=30)
+        except Exception:
+            logger.exception("Failed to update map cycle")
+            raise
+        finally:
+            await asyncio.wait_for(client.close(), timeout=10)
+
+        await asyncio.sleep(0.5)
+        logger.info("Map Cycle Updater End")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,147 @@
+"""
+Replays captured RCON replies through the render pipeline offline.
+
+    python replay_captures.py CAPTURE_DIR_OR_FILE [...]
+
+Every reply is parsed, rendered to an embed and checked against the last
+published embed, the same way the current map updater would, to report the
+throughput, parse error rate and the number of Discord edits it would make.
+Replies are parsed tolerantly when `CURRENT_MAP_MAX_PARSE_ERRORS` is set, as
+by the updater, unless `--strict` is given.
+"""
+import argparse
+import dataclasses
+import importlib
+import logging
+import time
+from collections.abc import Iterable
+from typing import TYPE_CHECKING
+
+from bot30 import settings
+from bot30.capture import CapturedReply, read_captures
+from bot30.models import Server
+from bot30.rcon import RCONClient
+from current_map_updater import (
+    check_partial,
+    create_server_embed,
+    embed_changed,
+    same_map_and_specs,
+)
+
+if TYPE_CHECKING:
+    import discord
+
+logger = logging.getLogger("bot30.replay")
+
+
+@dataclasses.dataclass
+class ReplayStats:
+    replies: int = 0
+    errors: int = 0
+    partial: int = 0
+    skipped: int = 0
+    edits: int = 0
+    elapsed: float = 0.0
+    first_ts: float = 0.0
+    last_ts: float = 0.0
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.replies if self.replies else 0.0
+
+    @property
+    def throughput(self) -> float:
+        return self.replies / self.elapsed if self.elapsed else 0.0
+
+
+def parse_reply(reply: CapturedReply, *, tolerant: bool = False) -> Server:
+    # the same reassembly as for live replies, duplicates and ordering included
+    lines = RCONClient.iter_lines(RCONClient.reassemble(reply.datagrams))
+    return Server.from_lines(lines, tolerant=tolerant)
+
+
+def replay(
+    replies: Iterable[CapturedReply],
+    *,
+    tolerant: bool | None = None,
+) -> ReplayStats:
+    """
+    Replays the `players` replies, parsing them tolerantly as the updater
+    does unless `tolerant` is given.
+    """
+    if tolerant is None:
+        tolerant = settings.CURRENT_MAP_MAX_PARSE_ERRORS > 0
+    stats = ReplayStats()
+    server: Server | None = None
+    published: discord.Embed | None = None
+    # discord.py is imported on first use when rendering, which is slow and
+    # not part of the throughput
+    importlib.import_module("discord")
+    start = time.perf_counter()
+    for reply in replies:
+        if reply.cmd != "players":
+            continue
+        if not stats.replies:
+            stats.first_ts = reply.timestamp
+        stats.last_ts = reply.timestamp
+        stats.replies += 1
+        prev_server = server
+        try:
+            server = parse_reply(reply, tolerant=tolerant)
+        except Exception as exc:
+            logger.debug("Failed to parse reply at %s: %r", reply.timestamp, exc)
+            stats.errors += 1
+            server = None
+        else:
+            if server.partial:
+                logger.debug(
+                    "Partial reply at %s: %s", reply.timestamp, server.diagnostics
+                )
+                stats.partial += 1
+                if (server := check_partial(server)) is None:
+                    # too many parse errors for the updater to publish it
+                    stats.errors += 1
+        if same_map_and_specs(prev_server, server):
+            stats.skipped += 1
+            continue
+        embed = create_server_embed(server)
+        if published is None or embed_changed(published, embed):
+            stats.edits += 1
+            published = embed
+    stats.elapsed = time.perf_counter() - start
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("paths", nargs="+", help="capture files or directories")
+    parser.add_argument(
+        "--strict",
+        action="store_true",
+        help="fail the whole reply on a bad line instead of skipping it",
+    )
+    args = parser.parse_args()
+
+    stats = replay(read_captures(args.paths), tolerant=False if args.strict else None)
+    logger.info(
+        "Replayed %s replies in %.3fs (%.0f replies/s)",
+        stats.replies,
+        stats.elapsed,
+        stats.throughput,
+    )
+    logger.info(
+        "Parse errors: %s (%.2f%%), partial replies: %s",
+        stats.errors,
+        stats.error_rate * 100,
+        stats.partial,
+    )
+    logger.info(
+        "Discord edits: %s, skipped unchanged: %s, over %.1f captured minutes",
+        stats.edits,
+        stats.skipped,
+        (stats.last_ts - stats.first_ts) / 60,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Runs the map cycle and current map updaters as tasks of a single long lived
+process. Both share one Discord session and a single lookup of the channel
+and embed messages, while each keeps its own update interval.
+"""
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+
+import discord
+
+import current_map_updater
+import leaderboard_updater
+import mapcycle_updater
+from bot30 import __version__, settings
+from bot30.clients import Bot30Client
+from bot30.embeds import publish_embed
+from bot30.status_api import start_status_api
+
+logger = logging.getLogger("bot30.scheduler")
+
+
+class Scheduler:
+    def __init__(self, client: Bot30Client) -> None:
+        self.client = client
+        self.channel: discord.TextChannel | None = None
+        self.messages: dict[str, discord.Message | None] = {}
+        # last map seen on the server, used to list the maps up next
+        self.current_map: str | None = None
+        # the map cycle is updated both on schedule and on map changes
+        self._mapcycle_lock = asyncio.Lock()
+
+    async def discover(self) -> None:
+        titles = [settings.MAPCYCLE_EMBED_TITLE, settings.CURRENT_MAP_EMBED_TITLE]
+        if settings.LEADERBOARD_EMBED_TITLE:
+            titles.append(settings.LEADERBOARD_EMBED_TITLE)
+        self.channel, self.messages = await self.client.fetch_embed_messages(
+            settings.CHANNEL_NAME_MAPCYCLE, titles
+        )
+
+    def _channel(self) -> discord.TextChannel:
+        if self.channel is None:
+            raise RuntimeError("CHANNEL_NOT_DISCOVERED")
+        return self.channel
+
+    async def update_mapcycle(self) -> None:
+        title = settings.MAPCYCLE_EMBED_TITLE
+        async with self._mapcycle_lock:
+            embed = await mapcycle_updater.create_embed(self.current_map)
+            self.messages[title] = await publish_embed(
+                self._channel(), self.messages.get(title), embed
+            )
+
+    async def update_current_map(self) -> None:
+        title = settings.CURRENT_MAP_EMBED_TITLE
+        server = await current_map_updater.server_info()
+        if server is not None and server.map_name != self.current_map:
+            self.current_map = server.map_name
+            if settings.MAPCYCLE_UP_NEXT:
+                await self._refresh_mapcycle()
+        if self.messages.get(title) and current_map_updater.is_published(server):
+            logger.debug("Server state unchanged since last published")
+            current_map_updater.save_leaderboard_and_sessions()
+            return
+        # keep updating while players are online until the next scheduled run
+        stop_at = time.monotonic() + (
+            settings.SCHEDULER_CURRENT_MAP_INTERVAL
+            - settings.CURRENT_MAP_UPDATE_DELAY
+            - 1.5
+        )
+        self.messages[title] = await current_map_updater.publish_current_map(
+            self._channel(), self.messages.get(title), server, stop_at
+        )
+
+    async def _refresh_mapcycle(self) -> None:
+        # the compiled map cycle is reused, only the up next list is rendered
+        try:
+            await self.update_mapcycle()
+        except Exception:
+            logger.exception("Failed to refresh map cycle for %s", self.current_map)
+
+    async def update_leaderboard(self) -> None:
+        title = settings.LEADERBOARD_EMBED_TITLE
+        leaderboard = current_map_updater.get_leaderboard()
+        if not title or leaderboard is None:
+            return
+        embed = leaderboard_updater.create_embed(leaderboard, title)
+        self.messages[title] = await publish_embed(
+            self._channel(), self.messages.get(title), embed
+        )
+
+    async def _run_every(
+        self,
+        interval: float,
+        title: str,
+        job: Callable[[], Awaitable[None]],
+    ) -> None:
+        while True:
+            started = time.monotonic()
+            try:
+                await job()
+            except discord.NotFound:
+                logger.warning("Message for %r was deleted, recreating", title)
+                self.messages[title] = None
+            except Exception:
+                logger.exception("Failed to update %r", title)
+            await asyncio.sleep(max(interval - (time.monotonic() - started), 0))
+
+    async def run(self) -> None:
+        tasks = [
+            self._run_every(
+                settings.SCHEDULER_MAPCYCLE_INTERVAL,
+                settings.MAPCYCLE_EMBED_TITLE,
+                self.update_mapcycle,
+            ),
+            self._run_every(
+                settings.SCHEDULER_CURRENT_MAP_INTERVAL,
+                settings.CURRENT_MAP_EMBED_TITLE,
+                self.update_current_map,
+            ),
+        ]
+        if settings.LEADERBOARD_EMBED_TITLE:
+            tasks.append(
+                self._run_every(
+                    settings.SCHEDULER_LEADERBOARD_INTERVAL,
+                    settings.LEADERBOARD_EMBED_TITLE,
+                    self.update_leaderboard,
+                )
+            )
+        await asyncio.gather(*tasks)
+
+
+async def async_main() -> None:
+    logger.info("Updater Scheduler v%s Start", __version__)
+
+    client = Bot30Client(settings.BOT_USER, settings.BOT_SERVER_NAME)
+    logger.info("%s", client)
+    status_api = None
+    if settings.STATUS_API_PORT:
+        status_api = await start_status_api(
+            current_map_updater.STATUS,
+            settings.STATUS_API_HOST,
+            settings.STATUS_API_PORT,
+        )
+    try:
+        await client.login(settings.BOT_TOKEN)
+        scheduler = Scheduler(client)
+        await scheduler.discover()
+        await scheduler.run()
+    except Exception:
+        logger.exception("Updater scheduler failed")
+        raise
+    finally:
+        await asyncio.wait_for(client.close(), timeout=5)
+        await current_map_updater.RCON_POOL.close()
+        if status_api is not None:
+            await status_api.cleanup()
+        logger.info("Updater Scheduler End")
+
+
+if __name__ == "__main__":
+    asyncio.run(async_main())
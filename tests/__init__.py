@@ -1,3 +1,37 @@
 from pathlib import Path
 
+from bot30.models import Server
+
 TEST_DATA_DIR = Path(__file__).parent / "data"
+
+SERVER_HEADER = """\
+Map: ut4_abbey
+Players: {count}
+GameType: CTF
+Scores: R:0 B:0
+MatchMode: OFF
+WarmupPhase: NO
+GameTime: 00:01:04
+"""
+
+PLAYER_LINE = (
+    "{slot}:{name}^7 TEAM:RED KILLS:{kills} DEATHS:{deaths} ASSISTS:0 "
+    "PING:{ping} AUTH:{auth} IP:127.0.0.1"
+)
+
+
+def make_player(**kwargs) -> str:
+    values = {"slot": 0, "name": "foo", "kills": 0, "deaths": 0, "ping": 50}
+    values.update(kwargs)
+    values.setdefault("auth", values["name"])
+    return PLAYER_LINE.format(**values)
+
+
+def make_server(
+    *players: str,
+    map_name: str = "ut4_abbey",
+    game_time: str = "00:01:04",
+) -> Server:
+    header = SERVER_HEADER.format(count=len(players))
+    header = header.replace("ut4_abbey", map_name).replace("00:01:04", game_time)
+    return Server.from_string(header + "\n".join(players))
@@ -0,0 +1,47 @@
+import asyncio
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from bot30.batching import BatchExecutor
+
+
+class BatchExecutorTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.executor = ThreadPoolExecutor(2)
+        self.batches = []
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def double(self, items: list[int]) -> list[int]:
+        self.batches.append(items)
+        return [i * 2 for i in items]
+
+    async def test_full_batches(self):
+        batcher = BatchExecutor(self.double, self.executor, batch_size=2)
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(4)))
+        self.assertListEqual(results, [0, 2, 4, 6])
+        self.assertListEqual(self.batches, [[0, 1], [2, 3]])
+
+    async def test_partial_batch_sent_after_delay(self):
+        batcher = BatchExecutor(self.double, self.executor, 10, max_delay=0.01)
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(3)))
+        self.assertListEqual(results, [0, 2, 4])
+        self.assertListEqual(self.batches, [[0, 1, 2]])
+
+    async def test_error_raised_to_every_item(self):
+        def fail(items: list[int]) -> list[int]:
+            raise ValueError(items)
+
+        batcher = BatchExecutor(fail, self.executor, batch_size=2)
+        results = await asyncio.gather(
+            batcher.submit(1), batcher.submit(2), return_exceptions=True
+        )
+        self.assertTrue(all(isinstance(r, ValueError) for r in results))
+
+    async def test_wrong_number_of_results(self):
+        batcher = BatchExecutor(lambda items: items[:1], self.executor, 2)
+        results = await asyncio.gather(
+            batcher.submit(1), batcher.submit(2), return_exceptions=True
+        )
+        self.assertTrue(all(isinstance(r, ValueError) for r in results))
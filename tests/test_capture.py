@@ -0,0 +1,82 @@
+import tempfile
+import unittest
+from unittest import mock
+
+from bot30 import settings
+from bot30.capture import CapturedReply, capture_reply, read_captures
+from replay_captures import replay
+
+IDLE = b"""\
+Map: ut4_abbey
+Players: 0
+GameType: CTF
+Scores: R:0 B:0
+MatchMode: OFF
+WarmupPhase: NO
+GameTime: 00:00:04
+"""
+
+ACTIVE = b"""\
+Map: ut4_abbey
+Players: 1
+GameType: CTF
+Scores: R:0 B:0
+MatchMode: OFF
+WarmupPhase: NO
+GameTime: 00:01:04
+0:foo^7 TEAM:RED KILLS:1 DEATHS:0 ASSISTS:0 PING:98 AUTH:foo IP:127.0.0.1
+"""
+
+
+def _reply(data: bytes) -> CapturedReply:
+    return CapturedReply(timestamp=0.0, cmd="players", datagrams=[data])
+
+
+class CaptureTestCase(unittest.TestCase):
+    def test_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            capture_reply(tmp_dir, "players", [IDLE])
+            capture_reply(tmp_dir, "players", [b"\xff\xfe", b"\xff\xfe"])
+            capture_reply(tmp_dir, "players", [])
+            replies = list(read_captures([tmp_dir]))
+        self.assertEqual(len(replies), 3)
+        self.assertEqual(replies[0].cmd, "players")
+        self.assertListEqual(replies[0].datagrams, [IDLE])
+        self.assertListEqual(replies[1].datagrams, [b"\xff\xfe", b"\xff\xfe"])
+        self.assertListEqual(replies[2].datagrams, [])
+
+
+class ReplayTestCase(unittest.TestCase):
+    def test_idle_server_edited_once(self):
+        stats = replay([_reply(IDLE)] * 3)
+        self.assertEqual(stats.replies, 3)
+        self.assertEqual(stats.edits, 1)
+        self.assertEqual(stats.errors, 0)
+
+    def test_active_server_edited_every_poll(self):
+        stats = replay([_reply(ACTIVE)] * 3)
+        self.assertEqual(stats.edits, 3)
+
+    def test_datagrams_reassembled(self):
+        header, players = ACTIVE.split(b"0:foo")
+        reply = CapturedReply(0.0, "players", [b"0:foo" + players, header, header])
+        stats = replay([reply])
+        self.assertEqual(stats.errors, 0)
+
+    def test_errors_counted(self):
+        bad = ACTIVE.replace(b"Players: 1", b"Players: 2")
+        stats = replay([_reply(IDLE), _reply(bad), _reply(IDLE)], tolerant=False)
+        self.assertEqual(stats.errors, 1)
+        self.assertAlmostEqual(stats.error_rate, 1 / 3)
+        self.assertEqual(stats.edits, 3)
+
+    def test_tolerant_like_the_updater(self):
+        bad = ACTIVE.replace(b"Players: 1", b"Players: 2")
+        stats = replay([_reply(bad)])
+        self.assertEqual(stats.partial, 1)
+        self.assertEqual(stats.errors, 0)
+        with mock.patch.object(settings, "CURRENT_MAP_MAX_PARSE_ERRORS", 1):
+            bad = bad.replace(b"KILLS:1", b"KILLS:x")
+            stats = replay([_reply(bad)])
+        self.assertEqual(stats.partial, 1)
+        self.assertEqual(stats.errors, 1)
@@ -0,0 +1,35 @@
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from bot30.clients import Bot30Client
+
+
+def _message(*titles: str) -> SimpleNamespace:
+    return SimpleNamespace(embeds=[SimpleNamespace(title=t) for t in titles])
+
+
+class FindMessagesTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.client = Bot30Client("30+Bot#TEST", "30+ Urban Test")
+        self.messages = [_message("Current Map"), _message("Other"), _message("Map")]
+        patcher = mock.patch.object(
+            self.client, "_last_messages", return_value=self.messages
+        )
+        self.last_messages = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_single_scan(self):
+        result = await self.client._find_messages_by_embed_titles(
+            mock.sentinel.channel, ["Map", "Current Map", "Missing"]
+        )
+        self.assertEqual(self.last_messages.call_count, 1)
+        self.assertIs(result["Map"], self.messages[2])
+        self.assertIs(result["Current Map"], self.messages[0])
+        self.assertIsNone(result["Missing"])
+
+    async def test_find_message_by_embed_title(self):
+        result = await self.client._find_message_by_embed_title(
+            mock.sentinel.channel, "Map"
+        )
+        self.assertIs(result, self.messages[2])
@@ -0,0 +1,100 @@
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import current_map_updater
+from bot30 import settings
+from bot30.models import Player
+from bot30.sessions import SessionTracker
+from bot30.state import save_state
+from current_map_updater import async_main, format_player, render_replies
+from tests import SERVER_HEADER, make_player, make_server
+
+
+class FormatPlayerTestCase(unittest.TestCase):
+    def test_current_ping(self):
+        player = Player.from_string(make_player(kills=3, deaths=1, ping=48))
+        self.assertEqual(format_player(player), f"{'foo':24} [  3/ 1/ 0]  48ms")
+
+    def test_session_ping(self):
+        tracker = SessionTracker()
+        for ping in (40, 60):
+            tracker.update(make_server(make_player(ping=ping)), 0)
+        player = Player.from_string(make_player(ping=60))
+        display = format_player(player, tracker.get(player))
+        self.assertTrue(display.endswith(" 50ms"))
+
+    def test_lagging_player_flagged(self):
+        tracker = SessionTracker()
+        for ping in (40, 60, 900):
+            tracker.update(make_server(make_player(ping=ping)), 0)
+        player = Player.from_string(make_player(ping=900))
+        display = format_player(player, tracker.get(player))
+        self.assertTrue(display.endswith("333ms!"))
+
+
+class RenderRepliesTestCase(unittest.TestCase):
+    def test_render(self):
+        reply = SERVER_HEADER.format(count=1) + make_player(name="bar", kills=7) + "\n"
+        [embed] = render_replies([reply.encode()])
+        self.assertEqual(embed["description"], "```\nut4_abbey (CTF)\n```")
+        self.assertIn("bar", embed["fields"][1]["value"])
+
+    def test_invalid_reply(self):
+        [embed] = render_replies([b"garbage"])
+        self.assertIn("Unable to retrieve", embed["description"])
+
+
+class AsyncMainTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.state_file = str(Path(tmp_dir.name) / "state")
+        self.server = make_server()
+        save_state(self.state_file, self.server)
+        for patcher in (
+            mock.patch.object(settings, "CURRENT_MAP_STATE_FILE", self.state_file),
+            mock.patch.object(settings, "CURRENT_MAP_STATE_MAX_AGE", 3600),
+            mock.patch.object(settings, "BOT_PROFILE_DIR", None),
+            mock.patch.object(current_map_updater, "save_leaderboard_and_sessions"),
+            mock.patch.object(current_map_updater.asyncio, "sleep"),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(
+            current_map_updater, "server_info", new_callable=mock.AsyncMock
+        )
+        self.server_info = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.server_info.return_value = self.server
+
+    async def _main_with_discord(self) -> mock.AsyncMock:
+        with (
+            mock.patch("bot30.clients.Bot30Client") as client_cls,
+            mock.patch.object(
+                current_map_updater, "update_current_map", new_callable=mock.AsyncMock
+            ) as update,
+        ):
+            client_cls.return_value.close = mock.AsyncMock()
+            await async_main()
+        client_cls.assert_called_once()
+        return update
+
+    async def test_published_state_skips_discord(self):
+        # importing either of these would fail
+        with mock.patch.dict(sys.modules, {"bot30.clients": None, "discord": None}):
+            await async_main()
+        self.server_info.assert_awaited_once()
+
+    async def test_expired_state_published(self):
+        with mock.patch.object(time, "time", return_value=time.time() + 3600):
+            update = await self._main_with_discord()
+        update.assert_awaited_once_with(mock.ANY, self.server)
+
+    async def test_map_change_published(self):
+        self.server_info.return_value = server = make_server(map_name="ut4_casa")
+        update = await self._main_with_discord()
+        update.assert_awaited_once_with(mock.ANY, server)
@@ -0,0 +1,49 @@
+import unittest
+from unittest import mock
+
+import discord
+
+from bot30.embeds import embed_content_changed, publish_embed
+
+
+def _embed(description: str, *fields: str) -> discord.Embed:
+    embed = discord.Embed(title="Test", description=description)
+    embed.add_field(name="updated", value="now")
+    for value in fields:
+        embed.add_field(name="field", value=value)
+    return embed
+
+
+class EmbedContentChangedTestCase(unittest.TestCase):
+    def test_timestamp_field_ignored(self):
+        message = mock.Mock(embeds=[_embed("a")])
+        new = _embed("a")
+        new.set_field_at(0, name="updated", value="later")
+        self.assertFalse(embed_content_changed(message, new))
+
+    def test_description_and_fields_compared(self):
+        message = mock.Mock(embeds=[_embed("a", "x")])
+        self.assertTrue(embed_content_changed(message, _embed("b", "x")))
+        self.assertTrue(embed_content_changed(message, _embed("a", "y")))
+
+
+class PublishEmbedTestCase(unittest.IsolatedAsyncioTestCase):
+    async def test_edited_message_returned(self):
+        new = _embed("b")
+        message = mock.Mock(embeds=[_embed("a")])
+        edited = mock.Mock(embeds=[new])
+        message.edit = mock.AsyncMock(return_value=edited)
+        result = await publish_embed(mock.Mock(), message, new)
+        self.assertIs(result, edited)
+        message.edit.assert_awaited_once_with(embed=new)
+
+    async def test_unchanged_message_kept(self):
+        message = mock.Mock(embeds=[_embed("a")])
+        message.edit = mock.AsyncMock()
+        self.assertIs(await publish_embed(mock.Mock(), message, _embed("a")), message)
+        message.edit.assert_not_awaited()
+
+    async def test_new_message_sent(self):
+        channel = mock.Mock()
+        channel.send = mock.AsyncMock(return_value="sent")
+        self.assertEqual(await publish_embed(channel, None, _embed("a")), "sent")
@@ -0,0 +1,100 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from bot30.leaderboard import Leaderboard, load_leaderboard, save_leaderboard
+from bot30.models import PlayerScore
+from bot30.sessions import SessionTracker
+from leaderboard_updater import create_leaderboard_embed
+from tests import make_player, make_server
+
+HOUR = 3600
+
+
+class LeaderboardTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.board = Leaderboard(window=24 * HOUR, bucket_size=HOUR)
+
+    def test_top(self):
+        self.board.add("foo", "foo", PlayerScore(5, 2, 0), 0)
+        self.board.add("bar", "bar", PlayerScore(5, 1, 0), 0)
+        self.board.add("baz", "baz", PlayerScore(1, 0, 0), 0)
+        self.board.add("foo", "foo", PlayerScore(1, 0, 0), HOUR)
+        top = self.board.top(2, HOUR)
+        self.assertListEqual([e.name for e in top], ["foo", "bar"])
+        self.assertEqual(top[0].kills, 6)
+
+    def test_expiry(self):
+        self.board.add("foo", "foo", PlayerScore(5, 2, 0), 0)
+        self.board.add("bar", "bar", PlayerScore(1, 0, 0), 2 * HOUR)
+        self.board.add("foo", "foo", PlayerScore(1, 1, 0), 2 * HOUR)
+        top = self.board.top(10, 25 * HOUR)
+        self.assertListEqual([(e.name, e.kills) for e in top], [("bar", 1), ("foo", 1)])
+        self.assertEqual(self.board.top(10, 27 * HOUR), [])
+        self.assertEqual(len(self.board), 0)
+
+    def test_add_sessions_expires(self):
+        self.board.add("foo", "foo", PlayerScore(5, 2, 0), 0)
+        self.board.changed = False
+        self.board.add_sessions(SessionTracker(), 25 * HOUR)
+        self.assertTrue(self.board.changed)
+        self.assertEqual(self.board.to_dict()["buckets"], [])
+
+    def test_zero_total_kept_until_expired(self):
+        self.board.add("foo", "foo", PlayerScore(-1, 1, 0), 0)
+        self.board.add("foo", "foo", PlayerScore(1, -1, 0), HOUR)
+        self.assertEqual(len(self.board.top(10, HOUR)), 1)
+        self.assertEqual(self.board.top(10, 25 * HOUR)[0].kills, 1)
+
+    def test_add_sessions(self):
+        tracker = SessionTracker()
+        tracker.update(
+            make_server(make_player(kills=2), make_player(slot=1, name="bar")), 0
+        )
+        self.assertFalse(self.board.add_sessions(tracker, 0))
+        tracker.update(
+            make_server(make_player(kills=5), make_player(slot=1, name="bar")), 5
+        )
+        self.assertTrue(self.board.add_sessions(tracker, 5))
+        top = self.board.top(10, 5)
+        self.assertListEqual([(e.name, e.kills) for e in top], [("foo", 3)])
+
+    def test_persistence(self):
+        self.board.add("foo", "Foo", PlayerScore(5, 2, 1), 0)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = str(Path(tmp_dir) / "leaderboard.json")
+            save_leaderboard(path, self.board)
+            self.assertFalse(self.board.changed)
+            board = load_leaderboard(path, 24 * HOUR, HOUR)
+        self.assertListEqual(board.top(10, 0), self.board.top(10, 0))
+        self.assertEqual(board.top(10, 0)[0].name, "Foo")
+
+    def test_scores_between_runs(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = str(Path(tmp_dir) / "leaderboard.json")
+            first = SessionTracker()
+            first.update(make_server(make_player(kills=2, deaths=1)), 0)
+            save_leaderboard(path, self.board, first)
+
+            second = SessionTracker()
+            board = load_leaderboard(path, 24 * HOUR, HOUR, second)
+            second.update(make_server(make_player(kills=5, deaths=1)), 60)
+            board.add_sessions(second, 60)
+            save_leaderboard(path, board, second)
+
+            # the round ended between the runs
+            third = SessionTracker()
+            board = load_leaderboard(path, 24 * HOUR, HOUR, third)
+            server = make_server(make_player(kills=1), game_time="00:00:10")
+            third.update(server, 120)
+            board.add_sessions(third, 120)
+        self.assertListEqual(
+            [(e.name, e.kills, e.deaths) for e in board.top(10, 120)],
+            [("foo", 4, 0)],
+        )
+
+    def test_embed(self):
+        self.board.add("foo", "foo", PlayerScore(5, 2, 1), 0)
+        embed = create_leaderboard_embed("Top", self.board.top(10, 0), 7 * 24 * HOUR)
+        self.assertIn(" 1. foo", embed.description)
+        self.assertIn("7 days", embed.fields[0].name)
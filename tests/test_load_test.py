@@ -0,0 +1,52 @@
+import unittest
+
+from bot30.models import Server
+from bot30.rcon import RCONClient
+from load_test import MAX_DATAGRAM_PAYLOAD, FakeGameServer
+
+
+class FakeTransport:
+    def __init__(self) -> None:
+        self.sent: list[bytes] = []
+
+    def sendto(self, data: bytes, _addr) -> None:
+        self.sent.append(data)
+
+
+class FakeGameServerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.game_server = FakeGameServer(64, seed=1)
+        self.transport = FakeTransport()
+        self.game_server.connection_made(self.transport)
+
+    def _reply(self) -> Server:
+        self.transport.sent.clear()
+        self.game_server.datagram_received(b"\xff\xff\xff\xffrcon x players\n", None)
+        fragments = [
+            memoryview(d)[len(RCONClient.REPLY_PREFIX) :] for d in self.transport.sent
+        ]
+        return Server.from_lines(RCONClient.iter_lines(fragments))
+
+    def test_reply_is_split_into_datagrams(self):
+        server = self._reply()
+        self.assertEqual(server.map_name, "ut4_abbey")
+        self.assertEqual(len(server.players), 64)
+        self.assertGreater(len(self.transport.sent), 1)
+        for data in self.transport.sent:
+            self.assertTrue(data.startswith(RCONClient.REPLY_PREFIX))
+            self.assertLessEqual(
+                len(data), len(RCONClient.REPLY_PREFIX) + MAX_DATAGRAM_PAYLOAD
+            )
+
+    def test_scores_change_between_replies(self):
+        first = self._reply()
+        for _ in range(5):
+            last = self._reply()
+        self.assertNotEqual(
+            [(p.kills, p.deaths) for p in first.players],
+            [(p.kills, p.deaths) for p in last.players],
+        )
+
+    def test_ignores_other_commands(self):
+        self.game_server.datagram_received(b"\xff\xff\xff\xffrcon x status\n", None)
+        self.assertEqual(self.transport.sent, [])
@@ -1,8 +1,16 @@
+import os
+import tempfile
 import unittest
+from pathlib import Path
 
+from bot30.maps import MapCatalog, Pk3Entry
 from mapcycle_updater import (
+    CompiledMapCycle,
+    create_mapcycle_embed,
+    load_mapcycle,
     map_mode,
     parse_mapcycle,
+    parse_mapcycle_lines,
 )
 from tests import TEST_DATA_DIR
 
@@ -56,3 +64,81 @@ class ParseMapCycleTestCase(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(len(cycle), 3)
         expect = {"ut4_casa": {}, "ut4_abbey": {}, "ut4_paris": {}}
         self.assertDictEqual(cycle, expect)
+
+    def test_options_interned(self):
+        lines = ["ut4_casa", "{", "g_gametype 4", "}", "ut4_abbey", "{"]
+        lines += ["g_gametype 4", "}", "ut4_paris", "ut4_turnpike"]
+        cycle = parse_mapcycle_lines(lines)
+        self.assertEqual(cycle["ut4_casa"], {"g_gametype": "4"})
+        self.assertIs(cycle["ut4_casa"], cycle["ut4_abbey"])
+        self.assertIs(cycle["ut4_paris"], cycle["ut4_turnpike"])
+
+    def test_unclosed_options(self):
+        cycle = parse_mapcycle_lines(["ut4_abbey", "ut4_casa", "{", "g_gametype 4"])
+        self.assertDictEqual(cycle, {"ut4_abbey": {}, "ut4_casa": {"g_gametype": "4"}})
+
+    async def test_load_reuses_compiled(self):
+        path = str(TEST_DATA_DIR / "mapcycle.txt")
+        compiled = await load_mapcycle(path)
+        self.assertEqual(len(compiled), 16)
+        self.assertIs(await load_mapcycle(path), compiled)
+
+    async def test_load_recompiles_modified(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "mapcycle.txt"
+            path.write_text("ut4_casa\nut4_abbey\n")
+            compiled = await load_mapcycle(str(path))
+            path.write_text("ut4_casa\n")
+            os.utime(path, ns=(0, 0))
+            self.assertEqual(len(await load_mapcycle(str(path))), 1)
+            self.assertEqual(len(compiled), 2)
+
+
+class CompiledMapCycleTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        gungame = {"g_gametype": "11"}
+        self.cycle = {"ut4_casa": gungame, "ut4_abbey": {}, "ut4_paris": gungame}
+        self.compiled = CompiledMapCycle(self.cycle)
+
+    def test_description(self):
+        expect = "\n".join(f"{k:25} {map_mode(v)}" for k, v in self.cycle.items())
+        self.assertEqual(self.compiled.description(), f"```\n{expect}```")
+
+    def test_window_wraps(self):
+        lines = self.compiled.window(2, 2)
+        self.assertTrue(lines[0].startswith("ut4_paris"))
+        self.assertTrue(lines[1].startswith("ut4_casa"))
+        self.assertTrue(lines[1].endswith("(GUNGAME)"))
+
+    def test_page(self):
+        self.assertEqual(len(self.compiled.page(0, 2)), 2)
+        self.assertEqual(len(self.compiled.page(1, 2)), 1)
+
+    def test_up_next(self):
+        lines = self.compiled.up_next("ut4_abbey", 10)
+        self.assertEqual([ln.split()[0] for ln in lines], ["ut4_paris", "ut4_casa"])
+        self.assertListEqual(self.compiled.up_next("ut4_turnpike", 10), [])
+
+
+class CreateMapCycleEmbedTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.cycle = {"ut4_casa": {}, "ut4_abbey": {}, "ut4_paris": {}}
+
+    def test_no_catalog(self):
+        embed = create_mapcycle_embed(self.cycle)
+        self.assertEqual(len(embed.fields), 1)
+        self.assertEqual(embed.fields[0].name, "3 maps")
+
+    def test_missing_maps(self):
+        entry = Pk3Entry(0, 0, ["ut4_casa", "ut4_abbey"], [])
+        catalog = MapCatalog({"zpak000.pk3": entry})
+        embed = create_mapcycle_embed(self.cycle, catalog)
+        self.assertEqual(len(embed.fields), 2)
+        self.assertEqual(embed.fields[1].name, "Missing Maps")
+        self.assertIn("ut4_paris", embed.fields[1].value)
+
+    def test_up_next(self):
+        embed = create_mapcycle_embed(self.cycle, current_map="ut4_abbey")
+        self.assertEqual(len(embed.fields), 2)
+        self.assertEqual(embed.fields[1].name, "Up Next after ut4_abbey")
+        self.assertIn("ut4_paris", embed.fields[1].value)
@@ -0,0 +1,68 @@
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+from unittest import mock
+
+from bot30 import maps
+from bot30.maps import load_catalog, load_catalog_cached
+
+
+class MapCatalogTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.maps_dir = Path(self.tmp_dir.name)
+        self.cache_file = str(self.maps_dir / "catalog.json")
+        self._write_pk3(
+            "zpak000.pk3",
+            ["maps/ut4_abbey.bsp", "maps/ut4_casa.bsp", "levelshots/ut4_abbey.jpg"],
+        )
+        self._write_pk3("ut4_paris_v2.pk3", ["maps/ut4_paris_v2.bsp", "readme.txt"])
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def _write_pk3(self, name: str, entries: list[str]) -> None:
+        with zipfile.ZipFile(self.maps_dir / name, "w") as zf:
+            for entry in entries:
+                zf.writestr(entry, b"")
+
+    def test_catalog(self):
+        catalog = load_catalog(str(self.maps_dir))
+        self.assertEqual(len(catalog), 3)
+        self.assertIn("UT4_Abbey", catalog)
+        info = catalog.get("ut4_abbey")
+        self.assertEqual(info.pk3, "zpak000.pk3")
+        self.assertEqual(info.levelshot, "levelshots/ut4_abbey.jpg")
+        self.assertIsNone(catalog.get("ut4_casa").levelshot)
+        self.assertListEqual(
+            catalog.missing(["ut4_casa", "ut4_paris", "ut4_paris_v2"]),
+            ["ut4_paris"],
+        )
+
+    def test_bad_pk3_skipped(self):
+        (self.maps_dir / "broken.pk3").write_bytes(b"not a zip")
+        catalog = load_catalog(str(self.maps_dir))
+        self.assertEqual(len(catalog), 3)
+
+    def test_cache_is_incremental(self):
+        load_catalog(str(self.maps_dir), self.cache_file)
+        with mock.patch.object(maps, "scan_pk3", wraps=maps.scan_pk3) as scan:
+            catalog = load_catalog(str(self.maps_dir), self.cache_file)
+            self.assertEqual(scan.call_count, 0)
+            self.assertEqual(len(catalog), 3)
+
+            self._write_pk3("ut4_turnpike.pk3", ["maps/ut4_turnpike.bsp"])
+            catalog = load_catalog(str(self.maps_dir), self.cache_file)
+            self.assertEqual(scan.call_count, 1)
+            self.assertIn("ut4_turnpike", catalog)
+
+    def test_cached_until_pk3s_change(self):
+        catalog = load_catalog_cached(str(self.maps_dir))
+        with mock.patch.object(maps, "scan_pk3", wraps=maps.scan_pk3) as scan:
+            self.assertIs(load_catalog_cached(str(self.maps_dir)), catalog)
+            self._write_pk3("ut4_turnpike.pk3", ["maps/ut4_turnpike.bsp"])
+            catalog = load_catalog_cached(str(self.maps_dir))
+            self.assertEqual(scan.call_count, 1)
+        self.assertIn("ut4_turnpike", catalog)
+        self.assertIs(load_catalog_cached(str(self.maps_dir)), catalog)
@@ -2,8 +2,10 @@ import unittest
 from textwrap import dedent
 
 from bot30.models import (
+    ParseError,
     Player,
     Server,
+    ServerParseError,
 )
 
 
@@ -120,3 +122,68 @@ class ServerTestCase(unittest.TestCase):
         self.assertEqual(server.game_time, "00:12:04")
         self.assertEqual(len(server.players), 3)
         self.assertListEqual([p.name for p in server.team_free], ["baz", "bar", "foo"])
+
+
+TRUNCATED = """\
+Map: ut4_abbey
+Players: 3
+GameType: CTF
+Scores: R:5 B:10
+MatchMode: OFF
+WarmupPhase: NO
+GameTime: 00:12:04
+0:foo^7 TEAM:RED KILLS:15 DEATHS:22 ASSISTS:0 PING:98 AUTH:foo IP:127.0.0.1
+1:bar^7 TEAM:BLUE KILLS:20 DEATHS:9 ASSISTS:0 PING:98 AUTH:bar IP:127.0.0.1
+2:baz^7 TEAM:RED KILLS:32 DEATHS:1
+"""
+
+
+class ServerParseTestCase(unittest.TestCase):
+    def test_strict_count_mismatch(self):
+        with self.assertRaises(RuntimeError) as ctx:
+            Server.from_string(TRUNCATED.rsplit("\n", 2)[0])
+        self.assertIsInstance(ctx.exception, ServerParseError)
+
+    def test_strict_invalid_player(self):
+        with self.assertRaises(ValueError) as ctx:
+            Server.from_string(TRUNCATED)
+        self.assertIsInstance(ctx.exception, ParseError)
+        self.assertEqual(ctx.exception.diagnostic.line_no, 10)
+        self.assertEqual(ctx.exception.diagnostic.reason, "INVALID_PLAYER")
+
+    def test_strict_complete(self):
+        data = TRUNCATED.rsplit("\n", 2)[0].replace("Players: 3", "Players: 2")
+        server = Server.from_string(data)
+        self.assertFalse(server.partial)
+        self.assertEqual(server.diagnostics, [])
+
+    def test_tolerant_skips_bad_lines(self):
+        server = Server.from_string(TRUNCATED + "garbage\n", tolerant=True)
+        self.assertTrue(server.partial)
+        self.assertListEqual([p.name for p in server.players], ["bar", "foo"])
+        self.assertListEqual(
+            [(d.line_no, d.reason) for d in server.diagnostics],
+            [
+                (10, "INVALID_PLAYER"),
+                (11, "MISSING_SEPARATOR"),
+                (0, "PLAYER_COUNT_MISMATCH"),
+            ],
+        )
+
+    def test_tolerant_missing_settings(self):
+        with self.assertRaises(ServerParseError) as ctx:
+            Server.from_string("Map: ut4_abbey\nPlayers: 0", tolerant=True)
+        self.assertEqual(ctx.exception.diagnostics[-1].reason, "MISSING_SETTINGS")
+        self.assertEqual(ctx.exception.diagnostics[-1].line, "GameTime")
+
+    def test_tolerant_invalid_settings(self):
+        data = "Map: ut4_abbey\nPlayers: 1\x00\nGameTime: 00:01:04\n"
+        with self.assertRaises(ServerParseError) as ctx:
+            Server.from_string(data, tolerant=True)
+        diagnostic = ctx.exception.diagnostics[-1]
+        self.assertEqual(diagnostic.reason, "INVALID_SETTING")
+        self.assertEqual(diagnostic.line, "Players: 1\x00")
+
+    def test_strict_missing_settings(self):
+        server = Server.from_string("Map: ut4_abbey\nPlayers: 0")
+        self.assertEqual(server.map_name, "ut4_abbey")
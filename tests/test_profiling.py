@@ -0,0 +1,51 @@
+import asyncio
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from bot30.profiling import profile_run, span
+
+
+class ProfileRunTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def _reports(self) -> list[Path]:
+        return sorted(Path(self.tmp_dir.name).iterdir())
+
+    async def test_disabled(self):
+        async with profile_run("test", None):
+            with span("noop"):
+                await asyncio.sleep(0)
+        self.assertListEqual(self._reports(), [])
+
+    async def test_report_written(self):
+        async def blocking():
+            time.sleep(0.02)
+
+        async with profile_run("test", self.tmp_dir.name, 0.01):
+            with span("login"):
+                await asyncio.sleep(0)
+            await asyncio.gather(blocking())
+
+        reports = self._reports()
+        self.assertListEqual([p.suffix for p in reports], [".prof", ".txt"])
+        report = reports[1].read_text("utf-8")
+        self.assertIn("login", report)
+        self.assertIn("Slow callbacks (1)", report)
+
+    async def test_report_written_on_timeout(self):
+        async def slow():
+            with span("history"):
+                await asyncio.sleep(1)
+
+        with self.assertRaises(asyncio.TimeoutError):
+            async with profile_run("test", self.tmp_dir.name):
+                await asyncio.wait_for(slow(), timeout=0.01)
+
+        report = self._reports()[1].read_text("utf-8")
+        self.assertIn("history  [CancelledError]", report)
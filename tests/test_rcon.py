@@ -0,0 +1,154 @@
+import asyncio
+import unittest
+
+import asyncio_dgram
+
+from bot30.rcon import RCONClient, RCONClientError, RCONConnectionPool
+
+PREFIX = RCONClient.REPLY_PREFIX
+
+HEADER = (
+    b"Map: ut4_abbey\nPlayers: 2\nGameType: CTF\nScores: R:5 B:10\n"
+    b"MatchMode: OFF\nWarmupPhase: NO\nGameTime: 00:12:04\n"
+)
+PLAYER_1 = b"0:foo TEAM:RED KILLS:15 DEATHS:22 ASSISTS:0 PING:98 AUTH:foo IP:1.2.3.4\n"
+PLAYER_2 = b"1:bar TEAM:BLUE KILLS:20 DEATHS:9 ASSISTS:0 PING:98 AUTH:bar IP:1.2.3.4\n"
+
+
+class FakeStream:
+    def __init__(self, datagrams: list[bytes]) -> None:
+        self.datagrams = datagrams
+
+    async def recv(self) -> tuple[bytes, tuple[str, int]]:
+        if self.datagrams:
+            return self.datagrams.pop(0), ("127.0.0.1", 27960)
+        await asyncio.sleep(10)
+        raise AssertionError
+
+
+class IterLinesTestCase(unittest.TestCase):
+    def test_lines(self):
+        views = [memoryview(PREFIX + HEADER)[len(PREFIX) :]]
+        lines = list(RCONClient.iter_lines(views))
+        self.assertEqual(len(lines), 7)
+        self.assertEqual(lines[0], "Map: ut4_abbey")
+        self.assertEqual(lines[-1], "GameTime: 00:12:04")
+
+    def test_line_split_across_fragments(self):
+        views = [memoryview(PLAYER_1[:10]), memoryview(PLAYER_1[10:] + PLAYER_2)]
+        lines = list(RCONClient.iter_lines(views))
+        self.assertListEqual(lines, [PLAYER_1[:-1].decode(), PLAYER_2[:-1].decode()])
+
+    def test_no_trailing_newline(self):
+        views = [memoryview(b"a:1\nb:2")]
+        self.assertListEqual(list(RCONClient.iter_lines(views)), ["a:1", "b:2"])
+
+
+class ReceiveTestCase(unittest.IsolatedAsyncioTestCase):
+    async def _receive(self, datagrams: list[bytes]) -> list[memoryview]:
+        client = RCONClient("127.0.0.1", 27960, "sekret")
+        client.stream = FakeStream(list(datagrams))  # type: ignore[assignment]
+        received = await client._receive(timeout=0.01)
+        self.assertListEqual(received, datagrams)
+        return RCONClient.reassemble(received)
+
+    async def test_prefix_stripped(self):
+        fragments = await self._receive([PREFIX + HEADER])
+        self.assertEqual(len(fragments), 1)
+        self.assertEqual(bytes(fragments[0]), HEADER)
+
+    async def test_duplicates_dropped(self):
+        dgram = PREFIX + PLAYER_1
+        fragments = await self._receive([PREFIX + HEADER, dgram, dgram])
+        self.assertEqual(len(fragments), 2)
+
+    async def test_out_of_order(self):
+        fragments = await self._receive([PREFIX + PLAYER_1 + PLAYER_2, PREFIX + HEADER])
+        server_data = b"".join(fragments)
+        self.assertTrue(server_data.startswith(HEADER))
+
+    async def test_server_info(self):
+        client = RCONClient("127.0.0.1", 27960, "sekret")
+        stream = FakeStream([PREFIX + PLAYER_2, PREFIX + HEADER + PLAYER_1])
+
+        async def send(_data: bytes) -> None:
+            pass
+
+        stream.send = send  # type: ignore[attr-defined]
+        client.stream = stream  # type: ignore[assignment]
+        server = await client.server_info(timeout=0.01)
+        self.assertEqual(server.map_name, "ut4_abbey")
+        self.assertListEqual([p.name for p in server.players], ["bar", "foo"])
+
+
+class FakeGameServer:
+    def __init__(self) -> None:
+        self.stream = None
+        self.requests = 0
+        self.task = None
+
+    async def start(self) -> tuple[str, int]:
+        self.stream = await asyncio_dgram.bind(("127.0.0.1", 0))
+        self.task = asyncio.create_task(self._serve())
+        return self.stream.sockname
+
+    async def _serve(self) -> None:
+        while True:
+            _, addr = await self.stream.recv()
+            self.requests += 1
+            await self.stream.send(PREFIX + HEADER.replace(b"2", b"0"), addr)
+
+    async def send_stale(self, addr) -> None:
+        await self.stream.send(PREFIX + b"stale", addr)
+
+    def stop(self) -> None:
+        self.task.cancel()
+        self.stream.close()
+
+
+class RCONConnectionPoolTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.server = FakeGameServer()
+        self.host, self.port = await self.server.start()
+        self.pool = RCONConnectionPool()
+
+    async def asyncTearDown(self) -> None:
+        await self.pool.close()
+        self.server.stop()
+
+    async def _server_info(self):
+        async with self.pool.client(self.host, self.port, "sekret") as c:
+            return c, await c.server_info(timeout=0.05)
+
+    async def test_connection_reused(self):
+        c1, server = await self._server_info()
+        stream = c1.stream
+        c2, _ = await self._server_info()
+        self.assertIs(c1, c2)
+        self.assertIs(stream, c2.stream)
+        self.assertEqual(server.map_name, "ut4_abbey")
+        self.assertEqual(self.server.requests, 2)
+
+    async def test_stale_datagrams_drained(self):
+        c, _ = await self._server_info()
+        await self.server.send_stale(c.stream.sockname)
+        await asyncio.sleep(0.01)
+        async with self.pool.client(self.host, self.port, "sekret") as c:
+            self.assertEqual(await c.drain(), 0)
+
+    async def test_concurrency_limited(self):
+        results = await asyncio.gather(*(self._server_info() for _ in range(3)))
+        self.assertEqual(len({id(c) for c, _ in results}), 1)
+        self.assertEqual(self.server.requests, 3)
+
+    async def test_reconnect_after_unreachable(self):
+        c, _ = await self._server_info()
+        self.server.stop()
+        with self.assertRaises(RCONClientError):
+            async with self.pool.client(self.host, self.port, "sekret") as c:
+                await c.server_info(timeout=0.01, retries=1)
+        self.server = FakeGameServer()
+        self.server.stream = await asyncio_dgram.bind((self.host, self.port))
+        self.server.task = asyncio.create_task(self.server._serve())
+        _, server = await self._server_info()
+        self.assertEqual(server.map_name, "ut4_abbey")
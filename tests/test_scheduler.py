@@ -0,0 +1,105 @@
+import asyncio
+import unittest
+from unittest import mock
+
+import discord
+
+import current_map_updater
+import mapcycle_updater
+import scheduler
+from bot30 import settings
+from scheduler import Scheduler
+from tests import make_server
+
+CURRENT_MAP = settings.CURRENT_MAP_EMBED_TITLE
+MAPCYCLE = settings.MAPCYCLE_EMBED_TITLE
+
+
+class SchedulerTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.client = mock.Mock()
+        self.scheduler = Scheduler(self.client)
+        self.scheduler.channel = mock.Mock()
+        for patcher in (
+            mock.patch.object(settings, "LEADERBOARD_EMBED_TITLE", None),
+            mock.patch.object(settings, "MAPCYCLE_UP_NEXT", 10),
+            mock.patch.object(current_map_updater, "save_leaderboard_and_sessions"),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.server_info = self._patch(
+            current_map_updater, "server_info", return_value=make_server()
+        )
+        self.publish_current_map = self._patch(
+            current_map_updater, "publish_current_map", return_value="published"
+        )
+        self.create_embed = self._patch(mapcycle_updater, "create_embed")
+        self.publish_embed = self._patch(scheduler, "publish_embed")
+
+    def _patch(self, target: object, name: str, **kwargs) -> mock.AsyncMock:
+        patcher = mock.patch.object(target, name, new_callable=mock.AsyncMock)
+        patched = patcher.start()
+        self.addCleanup(patcher.stop)
+        patched.configure_mock(**kwargs)
+        return patched
+
+    async def test_discover(self):
+        channel, message = mock.Mock(), mock.Mock()
+        self.client.fetch_embed_messages = mock.AsyncMock(
+            return_value=(channel, {CURRENT_MAP: message, MAPCYCLE: None})
+        )
+        await self.scheduler.discover()
+        self.client.fetch_embed_messages.assert_awaited_once_with(
+            settings.CHANNEL_NAME_MAPCYCLE, [MAPCYCLE, CURRENT_MAP]
+        )
+        self.assertIs(self.scheduler.channel, channel)
+        self.assertIs(self.scheduler.messages[CURRENT_MAP], message)
+
+    async def test_published_server_skipped(self):
+        self.scheduler.current_map = "ut4_abbey"
+        self.scheduler.messages[CURRENT_MAP] = message = mock.Mock()
+        with mock.patch.object(current_map_updater, "is_published", return_value=True):
+            await self.scheduler.update_current_map()
+        self.publish_current_map.assert_not_awaited()
+        self.create_embed.assert_not_awaited()
+        self.assertIs(self.scheduler.messages[CURRENT_MAP], message)
+
+    async def test_map_change_refreshes_mapcycle(self):
+        self.scheduler.current_map = "ut4_casa"
+        with mock.patch.object(current_map_updater, "is_published", return_value=False):
+            await self.scheduler.update_current_map()
+        self.create_embed.assert_awaited_once_with("ut4_abbey")
+        self.publish_embed.assert_awaited_once()
+        self.assertEqual(self.scheduler.messages[CURRENT_MAP], "published")
+
+    async def test_deleted_message_recreated(self):
+        self.scheduler.messages[CURRENT_MAP] = mock.Mock()
+        response = mock.Mock(status=404, reason="Not Found")
+        job = mock.AsyncMock(
+            side_effect=[discord.NotFound(response, "gone"), asyncio.CancelledError]
+        )
+        with self.assertRaises(asyncio.CancelledError):
+            await self.scheduler._run_every(0, CURRENT_MAP, job)
+        self.assertIsNone(self.scheduler.messages[CURRENT_MAP])
+
+    async def test_mapcycle_updates_serialized(self):
+        active = []
+
+        async def create_embed(_current_map: str | None) -> mock.Mock:
+            # the second update only starts once the first one is published
+            self.assertListEqual(active, [])
+            active.append(_current_map)
+            await asyncio.sleep(0.01)
+            return mock.Mock()
+
+        async def publish_embed(*_args) -> mock.Mock:
+            active.pop()
+            return mock.Mock()
+
+        self.create_embed.side_effect = create_embed
+        self.publish_embed.side_effect = publish_embed
+        await asyncio.gather(
+            self.scheduler.update_mapcycle(), self.scheduler._refresh_mapcycle()
+        )
+        self.assertEqual(self.create_embed.await_count, 2)
+        self.assertEqual(self.publish_embed.await_count, 2)
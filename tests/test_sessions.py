@@ -0,0 +1,101 @@
+import unittest
+
+from bot30.models import Player
+from bot30.sessions import RingBuffer, SessionTracker
+from tests import make_player, make_server
+
+
+class RingBufferTestCase(unittest.TestCase):
+    def test_empty(self):
+        buf = RingBuffer(3)
+        self.assertEqual(len(buf), 0)
+        self.assertIsNone(buf.mean())
+        self.assertIsNone(buf.percentile(95))
+
+    def test_wraps(self):
+        buf = RingBuffer(3)
+        for i in range(1, 6):
+            buf.append(i)
+        self.assertEqual(len(buf), 3)
+        self.assertListEqual(buf.values(), [3, 4, 5])
+        self.assertEqual(buf.mean(), 4)
+
+    def test_percentile(self):
+        buf = RingBuffer(100)
+        for i in range(1, 101):
+            buf.append(i)
+        self.assertEqual(buf.percentile(95), 95)
+        self.assertEqual(buf.percentile(0), 1)
+
+
+class SessionTrackerTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tracker = SessionTracker(samples=4)
+
+    def test_session_deltas(self):
+        self.tracker.update(make_server(make_player(kills=5, deaths=1)), 0)
+        self.tracker.update(make_server(make_player(kills=7, deaths=2)), 5)
+        sess = self.tracker.get(Player.from_string(make_player()))
+        self.assertEqual(sess.kills, 2)
+        self.assertEqual(sess.deaths, 1)
+        self.assertEqual(sess.kd_ratio, 2.0)
+        self.assertEqual(sess.recent_kills, 2)
+
+    def test_scores_carry_over_map_change(self):
+        self.tracker.update(make_server(make_player(kills=5, deaths=1)), 0)
+        self.tracker.update(make_server(make_player(kills=9, deaths=3)), 5)
+        self.tracker.update(make_server(make_player(kills=0, deaths=0)), 10)
+        self.tracker.update(make_server(make_player(kills=3, deaths=1)), 15)
+        sess = self.tracker.sessions[0]
+        self.assertEqual(sess.kills, 7)
+        self.assertEqual(sess.deaths, 3)
+
+    def test_scores_reset_on_new_map(self):
+        self.tracker.update(make_server(make_player(kills=25)), 0)
+        self.tracker.update(make_server(make_player(kills=1), map_name="ut4_casa"), 5)
+        sess = self.tracker.sessions[0]
+        self.assertEqual(sess.last_delta, (1, 0, 0))
+        self.assertEqual(sess.kills, 1)
+
+    def test_scores_reset_when_game_time_goes_back(self):
+        self.tracker.update(make_server(make_player(kills=25), game_time="00:19:00"), 0)
+        self.tracker.update(make_server(make_player(kills=2), game_time="00:00:30"), 5)
+        self.tracker.update(make_server(make_player(kills=4), game_time="00:00:35"), 10)
+        sess = self.tracker.sessions[0]
+        self.assertEqual(sess.kills, 4)
+
+    def test_ping_stats(self):
+        for i, ping in enumerate([40, 60, 999, 50, 70]):
+            self.tracker.update(make_server(make_player(ping=ping)), i)
+        sess = self.tracker.sessions[0]
+        self.assertEqual(len(sess.pings), 4)
+        self.assertEqual(sess.avg_ping, (60 + 999 + 50 + 70) / 4)
+        self.assertEqual(sess.p95_ping, 999)
+
+    def test_connecting_ping_ignored(self):
+        self.tracker.update(make_server(make_player(ping="CNCT")), 0)
+        self.assertIsNone(self.tracker.sessions[0].avg_ping)
+
+    def test_new_player_in_slot(self):
+        self.tracker.update(make_server(make_player(kills=5)), 0)
+        self.tracker.update(
+            make_server(make_player(name="bar", auth="bar", kills=1)), 5
+        )
+        sess = self.tracker.sessions[0]
+        self.assertEqual(sess.name, "bar")
+        self.assertEqual(sess.started, 5)
+
+    def test_unauthed_player_matched_by_name(self):
+        self.tracker.update(make_server(make_player(auth="---")), 0)
+        self.tracker.update(make_server(make_player(auth="---")), 5)
+        self.assertEqual(self.tracker.sessions[0].started, 0)
+        self.tracker.update(make_server(make_player(name="bar", auth="---")), 10)
+        self.assertEqual(self.tracker.sessions[0].started, 10)
+
+    def test_disconnected_players_dropped(self):
+        self.tracker.update(
+            make_server(make_player(), make_player(slot=1, name="bar")), 0
+        )
+        self.assertEqual(len(self.tracker), 2)
+        self.tracker.update(make_server(make_player()), 5)
+        self.assertEqual(len(self.tracker), 1)
@@ -0,0 +1,64 @@
+import tempfile
+import unittest
+from pathlib import Path
+from textwrap import dedent
+
+from bot30.models import Server
+from bot30.state import load_state, save_state
+
+IDLE_SERVER = """\
+Map: ut4_abbey
+Players: 1
+GameType: CTF
+Scores: R:0 B:0
+MatchMode: OFF
+WarmupPhase: NO
+GameTime: 00:00:04
+0:foo^7 TEAM:SPECTATOR KILLS:0 DEATHS:0 ASSISTS:0 PING:98 AUTH:foo IP:127.0.0.1
+"""
+
+
+class PublishedStateTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.state_file = str(Path(self.tmp_dir.name) / "state")
+        self.server = Server.from_string(dedent(IDLE_SERVER))
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_missing_state(self):
+        self.assertIsNone(load_state(self.state_file))
+
+    def test_invalid_state(self):
+        Path(self.state_file).write_text("{", "utf-8")
+        self.assertIsNone(load_state(self.state_file))
+
+    def test_same_server_is_current(self):
+        save_state(self.state_file, self.server)
+        state = load_state(self.state_file)
+        self.assertIsNotNone(state)
+        self.assertTrue(state.is_current(self.server, max_age=60))
+
+    def test_expired_state(self):
+        save_state(self.state_file, self.server)
+        state = load_state(self.state_file)
+        self.assertFalse(state.is_current(self.server, max_age=0))
+
+    def test_map_change(self):
+        save_state(self.state_file, self.server)
+        state = load_state(self.state_file)
+        server = Server.from_string(dedent(IDLE_SERVER).replace("abbey", "casa"))
+        self.assertFalse(state.is_current(server, max_age=60))
+
+    def test_active_players_never_current(self):
+        server = Server.from_string(dedent(IDLE_SERVER).replace("SPECTATOR", "RED"))
+        save_state(self.state_file, server)
+        state = load_state(self.state_file)
+        self.assertFalse(state.is_current(server, max_age=60))
+
+    def test_no_server_clears_state(self):
+        save_state(self.state_file, self.server)
+        save_state(self.state_file, None)
+        self.assertIsNone(load_state(self.state_file))
+        self.assertFalse(Path(self.state_file).exists())
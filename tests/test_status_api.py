@@ -0,0 +1,68 @@
+import json
+
+from aiohttp.test_utils import AioHTTPTestCase
+from aiohttp.web import Application
+
+from bot30.models import Server
+from bot30.status import StatusSnapshot
+from bot30.status_api import create_app
+from tests import make_player, make_server
+
+
+class StatusSnapshotTestCase(AioHTTPTestCase):
+    async def get_application(self) -> Application:
+        self.snapshot = StatusSnapshot(max_age=5)
+        return create_app(self.snapshot)
+
+    def _server(self, kills: int = 0) -> Server:
+        return make_server(make_player(kills=kills), make_player(slot=1, name="bar"))
+
+    async def test_no_snapshot(self):
+        async with self.client.get("/status") as resp:
+            self.assertEqual(resp.status, 503)
+
+    async def test_stale_snapshot(self):
+        self.snapshot.update(self._server())
+        self.snapshot.updated_at -= self.snapshot.stale_after + 1
+        async with self.client.get("/status") as resp:
+            self.assertEqual(resp.status, 503)
+
+    async def test_status(self):
+        self.snapshot.update(self._server(kills=3))
+        async with self.client.get("/status") as resp:
+            self.assertEqual(resp.status, 200)
+            self.assertEqual(resp.headers["Cache-Control"], "public, max-age=5")
+            data = json.loads(await resp.read())
+        self.assertEqual(data["map"], "ut4_abbey")
+        self.assertEqual(data["teams"]["red"][0]["name"], "foo")
+        self.assertEqual(data["teams"]["red"][0]["kills"], 3)
+        self.assertNotIn("127.0.0.1", json.dumps(data))
+
+    async def test_not_modified(self):
+        self.snapshot.update(self._server())
+        async with self.client.get("/status") as resp:
+            etag = resp.headers["ETag"]
+        headers = {"If-None-Match": etag}
+        async with self.client.get("/status", headers=headers) as resp:
+            self.assertEqual(resp.status, 304)
+
+        self.snapshot.update(self._server(kills=1))
+        async with self.client.get("/status", headers=headers) as resp:
+            self.assertEqual(resp.status, 200)
+            self.assertNotEqual(resp.headers["ETag"], etag)
+
+    async def test_weak_and_any_etag(self):
+        self.snapshot.update(self._server())
+        for if_none_match in (f'"x", W/{self.snapshot.etag}', "*"):
+            headers = {"If-None-Match": if_none_match}
+            async with self.client.get("/status", headers=headers) as resp:
+                self.assertEqual(resp.status, 304)
+        headers = {"If-None-Match": 'W/"x"'}
+        async with self.client.get("/status", headers=headers) as resp:
+            self.assertEqual(resp.status, 200)
+
+    async def test_body_rebuilt_only_on_change(self):
+        self.assertTrue(self.snapshot.update(self._server()))
+        body = self.snapshot.body
+        self.assertFalse(self.snapshot.update(self._server()))
+        self.assertIs(self.snapshot.body, body)